@@ -0,0 +1,277 @@
+"""
+Benchmark harness for the screen converter
+=========================================
+
+Generates synthetic screen sheets (CSV or XLSX) shaped like the real exports and
+times each stage of a conversion:
+
+- read_file   : ExcelToJsonConverter.read_file (parse, select, clean, rename)
+- grouping    : single-pass grouping of rows by screen_template_id
+- build       : building every screen dict (_build_screens)
+- serialize   : JsonSerializer.dumps of every screen
+- write       : ScreenWriter (threads, temp file + rename)
+- validate    : validate_json over the written files
+
+Each stage is timed once without tracing and, unless --no-memory is given, run a
+second time under tracemalloc to record its peak Python memory.
+
+Usage:
+    python benchmark.py --sizes 1000 10000 --formats csv xlsx
+    python benchmark.py --sizes 100000 --baseline benchmark_baseline.json
+    python benchmark.py --sizes 1000 10000 --update-baseline benchmark_baseline.json
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import excel_to_json_converter
+from excel_to_json_converter import ExcelToJsonConverter, JsonSerializer, ScreenWriter
+
+# Mapped columns first, then the columns the converter ignores
+SOURCE_COLUMNS = [
+    'Screen_ID', 'Screen Name', 'Stage', 'Title', 'Label', 'Description', 'Component type',
+    'Component(s) Name(s)', 'Options', 'Data Format', 'Default Value', 'Hard Min / Soft Min',
+    'Soft Max / Hard Max', 'Conditional Nav (Linear)', 'Tips', 'Small Print', 'References', 'Scope',
+    'Section', 'Tip Link 1 - Label : URL', 'Tip Link 2 - Label : URL',
+]
+IGNORED_COLUMNS = [
+    'Old Screen ID', 'JSON filename', 'JSON Review 1', 'Review 1 Notes', 'Arturo To Do',
+    'Global Variable(s)', 'Source', 'Notes', 'Data Transformation', 'Appearance on RPA',
+    'Appearance on Other Form', 'Help Topic', 'Help Context', 'Additional Terms & Conditions',
+    'Conditional Nav (Non-Linear)',
+]
+COMPONENT_TYPES = ['Choice', 'Dropdown', 'Text', 'Number', 'text box', 'Selection', 'Dollar Amount']
+STAGES = ['basics', 'offer', 'closing', 'inspection']
+SECTIONS = ['Funds & Financing', 'Property Info', 'Offer Terms', 'Contingencies']
+OPTIONS = ['Conventional', 'FHA', 'VA', 'USDA', 'Cash', 'Other', 'Yes', 'No', 'Not sure']
+
+# Used by the validate stage when screen_schema.json is not available
+BENCHMARK_SCHEMA = {
+    "type": "object",
+    "required": ["screen_template_id", "name", "title", "label", "description", "components"],
+    "properties": {
+        "components": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "required": ["id", "component_type", "name"],
+                "properties": {"id": {"type": "string", "format": "uuid"}}
+            }
+        }
+    }
+}
+
+# A stage regresses when it is slower than baseline * (1 + tolerance) and by more than the noise floor
+DEFAULT_TOLERANCE = 0.2
+NOISE_FLOOR_SECONDS = 0.05
+
+
+def iter_sheet_rows(rows, seed=0):
+    """Yield synthetic sheet rows (lists aligned with SOURCE_COLUMNS + IGNORED_COLUMNS)."""
+    rng = random.Random(seed)
+    written = 0
+    screen = 0
+    while written < rows:
+        screen += 1
+        screen_id = f"screen_{screen:07d}"
+        stage = rng.choice(STAGES)
+        section = rng.choice(SECTIONS)
+        # Most screens have one component, some have several rows
+        for part in range(min(rng.choice([1, 1, 1, 2, 3, 4]), rows - written)):
+            component_type = rng.choice(COMPONENT_TYPES)
+            options = ''
+            if component_type in ('Choice', 'Dropdown', 'Selection'):
+                options = ', '.join(rng.sample(OPTIONS, rng.randint(2, 5)))
+            scope = json.dumps({f"scope_flag_{rng.randint(1, 20)}": rng.choice([True, False])}) if rng.random() < 0.4 else ''
+            tip_1 = f"Learn more {screen} : https://www.example.com/insights/{screen}" if rng.random() < 0.5 else ''
+            tip_2 = f"Guide {screen} : http://guides.example.com/{part}" if rng.random() < 0.2 else ''
+            row = [
+                screen_id, f"screen_question_{screen}", stage, f"Question {screen} title?",
+                f"Label {screen}", f"Longer description for screen {screen}, part {part}.",
+                component_type, f"screen_field_{screen}_{part}" + ('_yes' if rng.random() < 0.1 else ''),
+                options, rng.choice(['Text', 'Number', 'Zip Code Number', '']),
+                rng.choice(['', 'true', 'false', 'Yes', '0']), rng.choice(['', '0', '100']),
+                rng.choice(['', '1000', '999999']), '', f"Tip text for screen {screen}",
+                rng.choice(['', 'Small print applies.']), f"REF-{screen:06d}", scope, section, tip_1, tip_2,
+            ]
+            row += [f"{column} note {rng.randint(0, 9999)}" for column in IGNORED_COLUMNS]
+            yield row
+            written += 1
+
+
+def generate_sheet(path, rows, fmt='csv', seed=0):
+    """Write a synthetic sheet with `rows` data rows (streamed, constant memory)."""
+    header = SOURCE_COLUMNS + IGNORED_COLUMNS
+    if fmt == 'csv':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            # Real exports start with a comment line before the header
+            f.write('Synthetic screen sheet generated by benchmark.py\n')
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(iter_sheet_rows(rows, seed))
+    elif fmt == 'xlsx':
+        import openpyxl
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(header)
+        for row in iter_sheet_rows(rows, seed):
+            sheet.append([value if value != '' else None for value in row])
+        workbook.save(path)
+    else:
+        raise ValueError(f"Unknown sheet format: {fmt}")
+    return path
+
+
+def measure(func, memory=True):
+    """Run func once timed and (optionally) once under tracemalloc; return (result, metrics)."""
+    start = time.perf_counter()
+    result = func()
+    metrics = {'seconds': round(time.perf_counter() - start, 6)}
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            metrics['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 3)
+        finally:
+            tracemalloc.stop()
+    return result, metrics
+
+
+def benchmark_sheet(sheet, workdir, schema, memory=True):
+    """Time every conversion stage on one sheet; returns {stage: metrics}."""
+    import validate_json
+
+    stages = {}
+    converter = ExcelToJsonConverter(sheet, os.path.join(workdir, 'unused'), row_selection_mode='all')
+
+    def read():
+        converter.read_file()
+        return converter.df
+
+    df, stages['read_file'] = measure(read, memory)
+    key = 'screen_template_id'
+    _, stages['grouping'] = measure(
+        lambda: converter._group_rows(df[key].tolist(), df[key].notna().tolist()), memory)
+    screens, stages['build'] = measure(lambda: list(converter._build_screens(df)), memory)
+    serializer = JsonSerializer()
+    _, stages['serialize'] = measure(lambda: [serializer.dumps(screen) for _, screen in screens], memory)
+
+    runs = []
+
+    def write():
+        output_dir = tempfile.mkdtemp(dir=workdir)
+        runs.append(output_dir)
+        writer = ScreenWriter(output_dir, serializer=serializer)
+        for screen_id, screen in screens:
+            writer.submit(screen_id, screen)
+        writer.close()
+        return output_dir
+
+    output_dir, stages['write'] = measure(write, memory)
+
+    def validate():
+        validator = validate_json.build_validator(schema)
+        return [validate_json.validate_json_file(path, validator)[0]
+                for path in validate_json.iter_json_files(output_dir)]
+
+    _, stages['validate'] = measure(validate, memory)
+    for run in runs:
+        shutil.rmtree(run, ignore_errors=True)
+
+    stages['counts'] = {'rows': len(df), 'screens': len(screens)}
+    return stages
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE, noise_floor=NOISE_FLOOR_SECONDS):
+    """List stages slower than the baseline: [(case, stage, baseline_s, current_s)]."""
+    regressions = []
+    for case, stages in results['results'].items():
+        for stage, metrics in stages.items():
+            reference = baseline.get('results', {}).get(case, {}).get(stage)
+            if not reference or 'seconds' not in metrics:
+                continue
+            limit = reference['seconds'] * (1 + tolerance)
+            if metrics['seconds'] > limit and metrics['seconds'] - reference['seconds'] > noise_floor:
+                regressions.append((case, stage, reference['seconds'], metrics['seconds']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the screen converter on synthetic sheets")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help="Sheet sizes in rows (e.g. 1000 10000 100000 1000000)")
+    parser.add_argument('--formats', nargs='+', choices=['csv', 'xlsx'], default=['csv'])
+    parser.add_argument('--output', default='benchmark_results.json', help="Machine-readable results file")
+    parser.add_argument('--baseline', help="Compare against this results file; exit 1 on regressions")
+    parser.add_argument('--update-baseline', metavar='PATH', help="Also store the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown ratio before a stage counts as a regression")
+    parser.add_argument('--schema', default=excel_to_json_converter.SCHEMA_FILE,
+                        help="Schema for the validate stage (a built-in one is used if missing)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass of each stage")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.schema):
+        with open(args.schema, 'r') as f:
+            schema = json.load(f)
+    else:
+        schema = BENCHMARK_SCHEMA
+
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'memory': not args.no_memory,
+        },
+        'results': {},
+    }
+    workdir = tempfile.mkdtemp(prefix='screen-benchmark-')
+    try:
+        for fmt in args.formats:
+            for size in args.sizes:
+                case = f"{fmt}-{size}"
+                print(f"Generating {case} sheet...")
+                sheet = generate_sheet(os.path.join(workdir, f"{case}.{fmt}"), size, fmt, args.seed)
+                print(f"Benchmarking {case}...")
+                results['results'][case] = benchmark_sheet(sheet, workdir, schema, memory=not args.no_memory)
+                for stage, metrics in results['results'][case].items():
+                    if 'seconds' in metrics:
+                        peak = f", peak {metrics['peak_mb']} MB" if 'peak_mb' in metrics else ''
+                        print(f"   {stage:<10} {metrics['seconds']:.3f}s{peak}")
+                os.remove(sheet)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.update_baseline:
+        with open(args.update_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.update_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for case, stage, before, after in regressions:
+            print(f"REGRESSION {case} {stage}: {before:.3f}s -> {after:.3f}s")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
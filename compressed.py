@@ -0,0 +1,62 @@
+import gzip
+
+try:
+    import zstandard  # Optional, only needed for 'zstd'
+except ImportError:
+    zstandard = None
+
+# File name suffix added by each compression
+SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+def check(compression):
+    """Raise ValueError for an unknown or unavailable compression."""
+    if compression not in SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("Compression 'zstd' needs the zstandard package")
+
+def compression_of(path):
+    """Compression of a file, from its name."""
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        return 'zstd'
+    return 'none'
+
+def writer(f, compression):
+    """Binary file object compressing everything written to it into f.
+
+    Data is compressed as it is written, never buffered whole. Closing the writer
+    ends the gzip member / zstd frame but leaves f open, so several members can
+    be appended to one file (decompressors read them back as one stream).
+    """
+    if compression == 'gzip':
+        # mtime=0 keeps the output identical for identical screens
+        return gzip.GzipFile(fileobj=f, mode='wb', compresslevel=GZIP_LEVEL, mtime=0)
+    if compression == 'zstd':
+        check(compression)
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(f, closefd=False)
+    raise ValueError(f"Not a compression: {compression}")
+
+def decompress(data, compression):
+    """Decompress one member/frame written by writer()."""
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'zstd':
+        check(compression)
+        # Streamed frames do not record their size, which ZstdDecompressor.decompress needs
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+def open_file(path):
+    """Open a plain, .gz or .zst file for reading its decompressed bytes."""
+    compression = compression_of(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        check(compression)
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
@@ -1,9 +1,62 @@
-import pandas as pd
+import argparse
+import collections
+import csv
+import functools
+import hashlib
+import importlib.util
+import io
 import json
+import logging
+import math
 import os
+import re
+import sys
+import tempfile
+import threading
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, List, Any
+import compressed
+from metrics import Metrics, Progress, profiled, setup_logging
+from screen_bundle import index_path
+
+try:
+    import orjson  # Optional faster JSON encoder
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class _LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access
+    
+    pandas takes longer to import than a small conversion takes to run, and
+    the stdlib CSV path (and validate_json) never need it. On first use the
+    module global is rebound to the real module, so later lookups are direct.
+    """
+
+    def __init__(self, name, global_name):
+        self._name = name
+        self._global_name = global_name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._global_name] = module
+        return getattr(module, attr)
+
+
+pd = _LazyModule('pandas', 'pd')
+
+
+def _isna(value) -> bool:
+    """pd.isna for a single cell without importing pandas (None, NaN, pd.NA, NaT)"""
+    if value is None or (isinstance(value, float) and value != value):
+        return True
+    return type(value).__name__ in ('NAType', 'NaTType')
 
 # Global configuration for test mode
 TEST_MODE = False  # Change to False to process all rows
@@ -19,6 +72,59 @@ ROW_SELECTION_MODE = 'indices'  # 'all', 'range', 'indices', 'ids'
 ROW_RANGE = (3, 8)          # Only if ROW_SELECTION_MODE == 'range', includes both ends
 ROW_INDICES = [12, 14, 16, 22, 31, 32, 37, 46, 68]    # Only if ROW_SELECTION_MODE == 'indices'
 ROW_IDS = ['id1', 'id2']    # Only if ROW_SELECTION_MODE == 'ids'
+# These globals are only defaults: ExcelToJsonConverter takes its own row selection arguments.
+ID_SCAN_CHUNKSIZE = 50000   # Rows per chunk when filtering by Screen_ID while reading
+# A blank or whitespace-only line: the CSV parser skips it, so it is not a row position
+BLANK_LINE = re.compile(rb'\n[ \t\r]*\n')
+
+# --- STDLIB CSV READER ---
+# convert() reads whole, non-incremental CSV files up to this size with the stdlib csv module
+# instead of pandas (csv_engine='auto'), which skips the pandas import for small jobs
+STDLIB_CSV_MAX_BYTES = 4 * 1024 * 1024
+
+# --- EXCEL INPUT ---
+# Workbooks streamed row by row with openpyxl in read-only mode (others go through pd.read_excel)
+EXCEL_STREAMING_EXTENSIONS = ('.xlsx', '.xlsm')
+# Cell texts pandas reads as missing values (pandas' default na_values, also used by the stdlib CSV reader)
+NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+])
+
+# --- NORMALIZATION CACHE ---
+# Distinct values remembered per memoized column transform (Section, Component type / Data Format,
+# Options, Default Value); each converter keeps its own caches across frames and chunks
+NORMALIZE_CACHE_SIZE = 4096
+
+# --- INCREMENTAL CONVERSION ---
+# Manifest of per-screen content hashes kept in the output directory of incremental runs.
+# Bump MANIFEST_VERSION whenever the screen building logic changes so every screen is rebuilt.
+MANIFEST_FILE = '_manifest.json'
+MANIFEST_VERSION = 3
+
+# --- OUTPUT LAYOUT ---
+# 'sharded' output puts each screen in a subdirectory named after the first SHARD_PREFIX_LENGTH
+# hex digits of the sha256 of its screen_template_id and lists every screen in INDEX_FILE
+SHARD_PREFIX_LENGTH = 2
+INDEX_FILE = '_index.json'
+# Screen files get the permissions open() would give them under the process umask (read once
+# here, as setting it is the only way to read it); mkstemp creates them owner-only
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+SCREEN_FILE_MODE = 0o666 & ~_UMASK
+
+# --- IN-PIPELINE VALIDATION ---
+SCHEMA_FILE = 'screen_schema.json'
+REJECTS_FILE = '_rejects.json'  # Screens that failed validation (written instead of their JSON)
+
+# --- WATCH MODE ---
+WATCH_POLL_INTERVAL = 0.2  # Seconds between two scans of the input directory
+WATCH_DEBOUNCE = 0.5       # Seconds a file must stay unchanged before it is converted
+
+# --- INSTRUMENTATION ---
+# Default names (inside the output directory) of the opt-in metrics report and cProfile dump
+METRICS_FILE = '_metrics.json'
+PROFILE_FILE = '_profile.prof'
 
 """
 CSV to JSON Column Mapping Documentation
@@ -70,8 +176,270 @@ Notas:
 - Las columnas ignoradas pueden contener comentarios, instrucciones internas o metadatos no relevantes para la estructura JSON de pantallas.
 """
 
+# Namespace of the deterministic (uuid5) ids: same screen/component names -> same ids on every run
+ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'hbm-schemas/screen-templates')
+
+# Skeleton of a select_single_cards child; copied and filled per option
+SELECT_CARD_TEMPLATE = {
+    "id": None,
+    "component_type": "select_card",
+    "name": None,
+    "is_array": False,
+    "is_private": False,
+    "is_editable": True,
+    "is_required": False,
+    "is_visible": True,
+    "default_value": False,
+    "value": False,
+    "suggested": None,
+    "validation": None,
+    "formatting": None,
+    "tooltip": None,
+    "fields": [],
+    "logic": [],
+    "children": []
+}
+
+
+class IdGenerator:
+    """
+    Source of component/child/field ids
+    
+    Random mode returns uuid4 strings drawn from one os.urandom call per batch
+    instead of one call per id. Deterministic mode returns uuid5 ids derived
+    from the key parts (screen id, component name, ...), so reruns on the same
+    sheet produce the same ids.
+    """
+
+    def __init__(self, deterministic: bool = False, batch_size: int = 1024):
+        self.deterministic = deterministic
+        self.batch_size = batch_size
+        self._batch = []
+
+    def new(self, *key) -> str:
+        """Return a new id; key parts are only used in deterministic mode"""
+        if self.deterministic:
+            return str(uuid.uuid5(ID_NAMESPACE, '/'.join(str(part) for part in key)))
+        if not self._batch:
+            raw = os.urandom(16 * self.batch_size)
+            self._batch = [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, len(raw), 16)]
+        return self._batch.pop()
+
+
+class JsonSerializer:
+    """
+    Serializes screens to UTF-8 JSON bytes
+    
+    Pretty mode matches json.dump(..., indent=2, ensure_ascii=False); compact mode
+    drops indentation and whitespace for production output. The 'orjson' backend
+    (used by 'auto' when installed) produces the same JSON, byte for byte except
+    the exponent spelling of very large/small floats (1e16 vs 1e+16); both write
+    NaN and infinite floats as null. Anything orjson refuses (e.g. ints over 64
+    bits) falls back to the stdlib encoder.
+    """
+
+    def __init__(self, compact: bool = False, backend: str = 'auto'):
+        if backend == 'auto':
+            backend = 'orjson' if orjson is not None else 'json'
+        if backend not in ('json', 'orjson'):
+            raise ValueError(f"Unknown JSON backend: {backend}")
+        if backend == 'orjson' and orjson is None:
+            raise ValueError("JSON backend 'orjson' is not installed")
+        self.compact = compact
+        self.backend = backend
+
+    def dumps(self, data) -> bytes:
+        """Serialize one screen"""
+        if self.backend == 'orjson':
+            try:
+                return orjson.dumps(data, option=0 if self.compact else orjson.OPT_INDENT_2)
+            except TypeError:
+                pass
+        try:
+            return self._dumps_json(data)
+        except ValueError:
+            # NaN and Infinity are not JSON: write them as null, like orjson does
+            return self._dumps_json(_finite_only(data))
+
+    def _dumps_json(self, data) -> bytes:
+        """Serialize with the stdlib encoder, raising ValueError on NaN/Infinity"""
+        if self.compact:
+            return json.dumps(data, ensure_ascii=False, separators=(',', ':'), allow_nan=False).encode('utf-8')
+        return json.dumps(data, indent=2, ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+
+def _finite_only(value):
+    """Copy of a JSON-like value with NaN and infinite floats replaced by None"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite_only(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite_only(item) for item in value]
+    return value
+
+
+def screen_relpath(screen_id: str, sharded: bool = False, compression: str = 'none') -> str:
+    """Path of a screen file relative to the output directory ('/' separated)"""
+    filename = f"{screen_id}.json{compressed.SUFFIXES[compression]}"
+    if not sharded:
+        return filename
+    shard = hashlib.sha256(str(screen_id).encode('utf-8')).hexdigest()[:SHARD_PREFIX_LENGTH]
+    return f"{shard}/{filename}"
+
+
+class ScreenWriter:
+    """Writer stage that serializes and writes screen files on a thread pool while the next ones are built"""
+
+    def __init__(self, output_dir: str, workers: int = 4, max_pending: int = None, serializer=None,
+                 metrics: Metrics = None, sharded: bool = False, compression: str = 'none'):
+        self.output_dir = output_dir
+        self.sharded = sharded
+        self.compression = compression
+        self.entries = {}
+        self._shards = set()
+        self.serializer = serializer or JsonSerializer()
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='screen-writer')
+        self.pending = threading.BoundedSemaphore(max_pending or workers * 4)
+        self.lock = threading.Lock()
+        self.written = []
+        self.failed = {}
+
+    def submit(self, screen_id, screen_data) -> None:
+        """Queue a screen for writing, blocking while the queue is full"""
+        self.pending.acquire()
+        try:
+            future = self.executor.submit(self._write, screen_id, screen_data)
+        except Exception:
+            self.pending.release()
+            raise
+        future.add_done_callback(lambda _: self.pending.release())
+
+    def _write(self, screen_id, screen_data) -> None:
+        """Serialize one screen to its file through a temporary file"""
+        relpath = screen_relpath(screen_id, self.sharded, self.compression)
+        output_file = os.path.join(self.output_dir, relpath)
+        directory = os.path.dirname(output_file)
+        tmp_file = None
+        try:
+            start = time.perf_counter()
+            data = self.serializer.dumps(screen_data)
+            serialized = time.perf_counter()
+            if self.sharded and directory not in self._shards:
+                os.makedirs(directory, exist_ok=True)
+                self._shards.add(directory)
+            fd, tmp_file = tempfile.mkstemp(dir=directory, prefix=f".{screen_id}.", suffix='.tmp')
+            os.chmod(tmp_file, SCREEN_FILE_MODE)
+            # Write the serialized bytes, through the compressor if any
+            with os.fdopen(fd, 'wb') as f:
+                if self.compression == 'none':
+                    f.write(data)
+                else:
+                    with compressed.writer(f, self.compression) as out:
+                        out.write(data)
+                size = f.tell()
+            os.replace(tmp_file, output_file)
+            self._record(start, serialized, size)
+        except Exception as e:
+            if tmp_file and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            logger.error("Error writing %s: %s", output_file, e)
+            with self.lock:
+                self.failed[screen_id] = str(e)
+            return
+        entry = None
+        if self.sharded:
+            entry = {'path': relpath, 'size': size, 'sha256': hashlib.sha256(data).hexdigest()}
+        with self.lock:
+            self.written.append(output_file)
+            if entry is not None:
+                self.entries[screen_id] = entry
+        logger.debug("Created JSON file: %s", output_file)
+
+    def _record(self, start, serialized, size) -> None:
+        """Record the metrics of one written screen (start/serialized are perf_counter times)"""
+        done = time.perf_counter()
+        self.metrics.add_time('serialize', serialized - start)
+        self.metrics.add_time('write', done - serialized)
+        self.metrics.observe('write', done - start)
+        self.metrics.count('bytes', size)
+
+    def close(self) -> dict:
+        """
+        Wait for every queued screen to be written
+        
+        Returns:
+            dict: {'written': [paths], 'failed': {screen_id: error}}
+        """
+        self.executor.shutdown(wait=True)
+        return {'written': self.written, 'failed': self.failed}
+
+
+class BundleWriter(ScreenWriter):
+    """Writer stage that appends every screen as one line of a JSON Lines bundle and indexes its offset"""
+
+    def __init__(self, output_dir: str, bundle_name: str, max_pending: int = None, backend: str = 'auto',
+                 metrics: Metrics = None, compression: str = 'none'):
+        # One screen per line, so the bundle is always compact
+        super().__init__(output_dir, workers=1, max_pending=max_pending or 64,
+                         serializer=JsonSerializer(compact=True, backend=backend), metrics=metrics,
+                         compression=compression)
+        self.bundle_file = os.path.join(output_dir, f"{bundle_name}.jsonl{compressed.SUFFIXES[compression]}")
+        self.tmp_file = self.bundle_file + '.tmp'
+        self.file = open(self.tmp_file, 'wb')
+        self.offset = 0
+        self.index = {}
+
+    def _write(self, screen_id, screen_data) -> None:
+        """Append one screen as a compact JSON line and index it"""
+        try:
+            start = time.perf_counter()
+            line = self.serializer.dumps(screen_data)
+            serialized = time.perf_counter()
+            if self.compression == 'none':
+                self.file.write(line + b'\n')
+                # The index leaves out the newline
+                length, size = len(line), len(line) + 1
+            else:
+                with compressed.writer(self.file, self.compression) as out:
+                    out.write(line + b'\n')
+                length = size = self.file.tell() - self.offset
+            self._record(start, serialized, size)
+        except Exception as e:
+            logger.error("Error writing %s to %s: %s", screen_id, self.bundle_file, e)
+            self.failed[screen_id] = str(e)
+            # Drop a partly written member so the following offsets stay right
+            self.file.seek(self.offset)
+            self.file.truncate()
+            return
+        self.index[screen_id] = [self.offset, length]
+        self.offset += size
+        self.written.append(f"{self.bundle_file}:{screen_id}")
+
+    def close(self) -> dict:
+        """Flush the bundle, then move it and its index into place"""
+        try:
+            result = super().close()
+        finally:
+            self.file.close()
+        os.replace(self.tmp_file, self.bundle_file)
+        index_file = index_path(self.bundle_file)
+        with open(index_file + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({"bundle": os.path.basename(self.bundle_file), "compression": self.compression,
+                       "screens": self.index}, f, ensure_ascii=False)
+        os.replace(index_file + '.tmp', index_file)
+        logger.info("Created JSON Lines bundle: %s (%d screens)", self.bundle_file, len(self.index))
+        return result
+
+
 class ExcelToJsonConverter:
-    def __init__(self, input_file: str, output_dir: str = 'json', skiprows_real_csv: bool = False):
+    def __init__(self, input_file: str, output_dir: str = 'json', skiprows_real_csv: bool = False,
+                 chunksize: int = None, writer_workers: int = 4, incremental: bool = False,
+                 deterministic_ids: bool = False, output_format: str = 'files', compact: bool = False,
+                 json_backend: str = 'auto', csv_engine: str = 'auto', cache_dir: str = None,
+                 row_selection_mode: str = None, row_range: tuple = None, row_indices: list = None,
+                 row_ids: list = None, layout: str = 'flat', compression: str = 'none'):
         """
         Initialize the converter with input and output paths
         
@@ -79,21 +447,71 @@ class ExcelToJsonConverter:
             input_file (str): Path to the input file (Excel or CSV)
             output_dir (str): Directory where JSON files will be saved
             skiprows_real_csv (bool): If True, skip header rows (for real CSV, not for tests)
+            chunksize (int): If set, stream CSV input in chunks of this many rows
+            writer_workers (int): Number of threads writing screen files
+            incremental (bool): Only rebuild screens whose rows or mapping changed since the last run
+            deterministic_ids (bool): Derive ids from screen/component names (uuid5) instead of uuid4
+            output_format (str): 'files' (one file per screen) or 'jsonl' (one bundle per input)
+            compact (bool): Write screen files without indentation
+            json_backend (str): 'auto', 'orjson' or 'json'
+            csv_engine (str): 'auto', 'stdlib', 'c', 'pyarrow' or 'python'
+            cache_dir (str): If set, cache parsed Excel frames there
+            row_selection_mode (str): 'all', 'range', 'indices' or 'ids' (defaults to ROW_SELECTION_MODE)
+            row_range, row_indices, row_ids: Row selection (default ROW_RANGE, ROW_INDICES, ROW_IDS)
+            layout (str): 'flat' or 'sharded' (hash-prefixed subdirectories plus INDEX_FILE)
+            compression (str): 'none', 'gzip' or 'zstd'
         """
+        if output_format not in ('files', 'jsonl'):
+            raise ValueError(f"Unknown output_format: {output_format}")
+        if output_format == 'jsonl' and incremental:
+            raise ValueError("Incremental mode needs per-screen files (output_format='files')")
+        if layout not in ('flat', 'sharded'):
+            raise ValueError(f"Unknown layout: {layout}")
+        if output_format == 'jsonl' and layout == 'sharded':
+            raise ValueError("A JSON Lines bundle is a single file and cannot be sharded")
+        if csv_engine == 'pyarrow' and chunksize and input_file.endswith('.csv'):
+            raise ValueError("csv_engine='pyarrow' cannot read CSV files in chunks, use 'c' with chunksize")
+        compressed.check(compression)
         self.input_file = input_file
         self.output_dir = output_dir
         self.skiprows_real_csv = skiprows_real_csv
+        self.chunksize = chunksize
+        self.csv_engine = csv_engine
+        self.cache_dir = cache_dir
+        # Per-instance copy of the row selection, the module globals are only defaults
+        self.row_selection_mode = row_selection_mode if row_selection_mode is not None else ROW_SELECTION_MODE
+        self.row_range = tuple(row_range if row_range is not None else ROW_RANGE)
+        self.row_indices = list(row_indices if row_indices is not None else ROW_INDICES)
+        self.row_ids = list(row_ids if row_ids is not None else ROW_IDS)
+        self.writer_workers = writer_workers
+        self.incremental = incremental
+        self.output_format = output_format
+        self.layout = layout
+        self.compression = compression
+        self.serializer = JsonSerializer(compact=compact, backend=json_backend)
+        self.ids = IdGenerator(deterministic=deterministic_ids)
+        self._component_templates = {}
+        self._blank_lines = None  # Cached result of _has_blank_lines
+        # Memoized per-value transforms of low-cardinality columns (see _map_distinct)
+        self._normalize_caches = {
+            name: functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE, typed=True)(transform)
+            for name, transform in (
+                ('section', self._distinct_section_name),
+                ('component_type', self._distinct_component_type),
+                ('options', self._distinct_options),
+                ('default_value', self._distinct_default_value),
+            )
+        }
         self.df = None
+        self.metrics = Metrics()  # Replaced by every convert() run
         
-        # Create date-based subfolder
-        current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        self.output_dir = os.path.join(output_dir, current_date)
-        
-        # Create output directory if it doesn't exist
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
-            
-        print(f"Output directory created: {self.output_dir}")
+        if incremental:
+            # Stable subfolder per input file so the next run can reuse unchanged screens
+            self.output_dir = os.path.join(output_dir, os.path.splitext(os.path.basename(input_file))[0])
+        else:
+            # Date-based subfolder, created by convert() (iter_screens never touches the disk)
+            current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            self.output_dir = os.path.join(output_dir, current_date)
             
         # Column mapping from CSV to JSON
         self.column_mapping = {
@@ -156,70 +574,499 @@ class ExcelToJsonConverter:
             'component_type'
         ]
         
+    def _pushdown_selection(self):
+        """
+        read_csv arguments that make the parser skip unselected rows, or None
+        
+        Rows are counted like df.iloc on a full read (a quoted multi-line cell is
+        one row). The parser counts blank lines too, so sheets with blank lines
+        (see _has_blank_lines), negative positions and the pyarrow engine (no
+        nrows or callable skiprows) return None and are selected by position
+        after reading instead.
+        """
+        mode = self.row_selection_mode
+        if mode not in ('range', 'indices') or self.csv_engine == 'pyarrow' or self._has_blank_lines():
+            return None
+        # Line 0 is the comment line, line 1 the header, data row N is line N + 2
+        if mode == 'range':
+            start, end = self.row_range
+            if start < 0 or end < 0:
+                return None
+            return {'skiprows': lambda line: line == 0 or 2 <= line < start + 2, 'nrows': max(end - start + 1, 0)}
+        if mode == 'indices':
+            if any(i < 0 for i in self.row_indices):
+                return None
+            wanted = frozenset(self.row_indices)
+            return {'skiprows': lambda line: line == 0 or (line >= 2 and line - 2 not in wanted), 'nrows': len(wanted)}
+        return None
+
+    def _has_blank_lines(self) -> bool:
+        """Whether the CSV has blank lines after its comment line (scanned once, in blocks)"""
+        if self._blank_lines is None:
+            self._blank_lines = False
+            with open(self.input_file, 'rb') as f:
+                f.readline()
+                # Keep the last (partial) line of each block with its leading newline
+                tail = b'\n'
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    data = tail + block
+                    if BLANK_LINE.search(data):
+                        self._blank_lines = True
+                        break
+                    tail = data[data.rfind(b'\n'):]
+        return self._blank_lines
+
+    def _select_rows(self, df, chunked=False, pushed_down=None):
+        """
+        Finish row selection on a frame read with _csv_read_options
+        
+        Range and index selections were already applied by the parser; this restores
+        the original row positions as index and, for whole-file reads, the order (and
+        repeats) of row_indices. Without pushdown the selection is done here with
+        iloc, or for chunks by the row positions of their index (file order, and no
+        negative positions; _iter_chunks reports indices past the end). 'ids' filters
+        the rows (a whole file or one chunk).
+        pushed_down defaults to whether _pushdown_selection applies to input_file.
+        """
+        mode = self.row_selection_mode
+        if pushed_down is None:
+            pushed_down = self._pushdown_selection() is not None
+        if mode == 'range':
+            start, end = self.row_range
+            if not pushed_down and chunked:
+                if start < 0 or end < 0:
+                    raise ValueError("Negative row ranges cannot be used when streaming")
+                return df[(df.index >= start) & (df.index <= end)]
+            if not pushed_down:
+                return df.iloc[start:end+1]
+            if not chunked:
+                df.index = pd.RangeIndex(start, start + len(df))
+            return df
+        if mode == 'indices':
+            if not pushed_down:
+                if chunked:
+                    if any(i < 0 for i in self.row_indices):
+                        raise ValueError("Negative row indices cannot be used when streaming")
+                    return df[df.index.isin(self.row_indices)]
+                missing = [i for i in self.row_indices if not -len(df) <= i < len(df)]
+                if missing:
+                    raise IndexError(f"Row indices out of range: {missing}")
+                return df.iloc[self.row_indices]
+            if chunked:
+                # Streaming keeps file order
+                return df
+            df.index = sorted(set(self.row_indices))[:len(df)]
+            missing = [i for i in self.row_indices if i not in df.index]
+            if missing:
+                raise IndexError(f"Row indices out of range: {missing}")
+            return df.loc[self.row_indices]
+        if mode == 'ids':
+            return df[df['Screen_ID'].isin(self.row_ids)]
+        return df
+
+    def _describe_selection(self) -> None:
+        """Log which rows the row selection will process"""
+        mode = self.row_selection_mode
+        if mode == 'all':
+            logger.info("Processing all rows")
+        elif mode == 'range':
+            start, end = self.row_range
+            logger.info("Processing rows from index %s to %s", start, end)
+        elif mode == 'indices':
+            logger.info("Processing rows with indices: %s", self.row_indices)
+        elif mode == 'ids':
+            logger.info("Processing rows with Screen_IDs: %s", self.row_ids)
+        else:
+            logger.warning("Row selection mode not recognized, processing all rows")
+
+    def _clean_rows(self, df):
+        """Remove empty rows and rows with null Screen_ID, then rename columns"""
+        df = df[df['Screen_ID'].notna()]
+        df = df.dropna(how='all')
+        # Rename columns according to mapping
+        return df.rename(columns=self.column_mapping)
+
+    def _csv_read_options(self, chunked=False, file=None) -> dict:
+        """
+        pd.read_csv arguments for the source sheet and row selection
+        
+        Only the columns listed in column_mapping are parsed (the ignored review/notes
+        columns are skipped by the parser) and they are read as strings, so pandas
+        does not infer a dtype per column and cells keep their literal text.
+        A file object can only be read once, so it gets no header pre-read and no
+        pushdown (rows are selected by _select_rows).
+        """
+        if file is not None:
+            return {'skiprows': 1, 'usecols': lambda column: column in self.column_mapping, 'dtype': str,
+                    'engine': 'c'}
+        # For CSV files, skip the first line (comment) and use second line as headers
+        header = pd.read_csv(self.input_file, skiprows=1, nrows=0).columns
+        options = {
+            'skiprows': 1,
+            'usecols': [column for column in header if column in self.column_mapping],
+            'dtype': str,
+        }
+        # Range/index selections are applied by the parser: unselected rows are never converted
+        pushdown = self._pushdown_selection()
+        if pushdown:
+            options.update(pushdown)
+        engine = self.csv_engine
+        if engine in ('auto', 'stdlib'):
+            # pyarrow supports neither chunks nor nrows/callable skiprows
+            use_pyarrow = not chunked and not pushdown and importlib.util.find_spec('pyarrow')
+            engine = 'pyarrow' if use_pyarrow else 'c'
+        if engine == 'pyarrow':
+            # pandas' pyarrow engine cannot combine skiprows with usecols names: skip the
+            # comment and header lines and select the columns by position instead
+            positions = [i for i, column in enumerate(header) if column in self.column_mapping]
+            options.update(skiprows=2, header=None, usecols=positions,
+                           names=[header[i] for i in positions], dtype='string')
+        options['engine'] = engine
+        return options
+
+    def _read_whole_csv(self):
+        """Read input_file in one go with _csv_read_options"""
+        options = self._csv_read_options()
+        df = pd.read_csv(self.input_file, **options)
+        if options['engine'] == 'pyarrow':
+            # Read as 'string' (dtype=str turns missing cells into 'None'): give them back as
+            # NaN in object columns, like the other parsers
+            df = df.astype(object).where(df.notna(), float('nan'))
+        return df
+
     def read_file(self) -> None:
         """Read the input file into a pandas DataFrame"""
         try:
             if self.input_file.endswith('.csv'):
-                # For CSV files, skip the first line (comment) and use second line as headers
-                self.df = pd.read_csv(self.input_file, skiprows=1)
-                
                 # --- FILTRADO FLEXIBLE DE FILAS ---
-                if ROW_SELECTION_MODE == 'all':
-                    print("Processing all rows")
-                elif ROW_SELECTION_MODE == 'range':
-                    start, end = ROW_RANGE
-                    self.df = self.df.iloc[start:end+1]
-                    print(f"Processing rows from index {start} to {end}")
-                elif ROW_SELECTION_MODE == 'indices':
-                    # Filter first by desired indices
-                    self.df = self.df.iloc[ROW_INDICES]
-                    print(f"Processing rows with indices: {ROW_INDICES}")
-                elif ROW_SELECTION_MODE == 'ids':
-                    self.df = self.df[self.df['Screen_ID'].isin(ROW_IDS)]
-                    print(f"Processing rows with Screen_IDs: {ROW_IDS}")
+                self._describe_selection()
+                if self.row_selection_mode == 'ids' and self.csv_engine != 'pyarrow':
+                    # Filter while reading so only matching rows are ever held in memory
+                    # (pyarrow cannot read in chunks and filters the whole frame below)
+                    reader = pd.read_csv(self.input_file, chunksize=ID_SCAN_CHUNKSIZE,
+                                         **self._csv_read_options(chunked=True))
+                    with reader:
+                        chunks = [self._select_rows(chunk, chunked=True) for chunk in reader]
+                    self.df = pd.concat(chunks) if chunks else pd.read_csv(self.input_file, nrows=0,
+                                                                           **self._csv_read_options(chunked=True))
                 else:
-                    print("ROW_SELECTION_MODE not recognized, processing all rows")
+                    self.df = self._select_rows(self._read_whole_csv())
                 
                 # After filtering, remove empty rows and rows with null Screen_ID
-                self.df = self.df[self.df['Screen_ID'].notna()]
-                self.df = self.df.dropna(how='all')
-                
-                print(f"Found {len(self.df)} valid rows")
-                # Rename columns according to mapping
-                self.df = self.df.rename(columns=self.column_mapping)
+                self.df = self._clean_rows(self.df)
+                logger.info("Found %d valid rows", len(self.df))
             else:
-                self.df = pd.read_excel(self.input_file)
-                print(f"Successfully read file: {self.input_file}")
-                self.df = self.df.rename(columns=self.column_mapping)
+                self.df = self._read_excel()
+                logger.info("Successfully read file: %s", self.input_file)
         except Exception as e:
-            print(f"Error reading file: {str(e)}")
+            logger.error("Error reading file: %s", e)
             raise
-            
-    def validate_data(self) -> bool:
+
+    # --- EXCEL INGESTION ---
+
+    def _excel_value(self, value):
+        """Normalize an openpyxl cell value the way pd.read_excel does"""
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str) and value in NA_VALUES:
+            return None
+        return value
+
+    def _iter_excel_chunks(self, chunksize=None):
+        """
+        Stream the first sheet of an .xlsx workbook as renamed DataFrame chunks
+        
+        The workbook is opened read-only and walked row by row; only the cells of
+        columns listed in column_mapping are kept and fully empty rows are skipped.
+        Without chunksize a single frame with every row is yielded.
+        """
+        import openpyxl
+        workbook = openpyxl.load_workbook(self.input_file, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, ())
+            keep = [i for i, name in enumerate(header) if name in self.column_mapping]
+            columns = [self.column_mapping[header[i]] for i in keep]
+            batch = []
+            start = 0
+            for row in rows:
+                values = [self._excel_value(row[i]) if i < len(row) else None for i in keep]
+                if all(value is None for value in values):
+                    continue
+                batch.append(values)
+                if chunksize and len(batch) >= chunksize:
+                    yield pd.DataFrame(batch, columns=columns, index=pd.RangeIndex(start, start + len(batch)))
+                    start += len(batch)
+                    batch = []
+            if batch or start == 0:
+                yield pd.DataFrame(batch, columns=columns, index=pd.RangeIndex(start, start + len(batch)))
+        finally:
+            workbook.close()
+
+    def _excel_cache_path(self) -> str:
+        """Cache file stem for the input workbook: path hash + hash of size, mtime and mapping"""
+        stat = os.stat(self.input_file)
+        path_key = hashlib.sha1(os.path.abspath(self.input_file).encode('utf-8')).hexdigest()[:16]
+        content_key = json.dumps([stat.st_size, stat.st_mtime_ns, self.column_mapping], sort_keys=True)
+        content_key = hashlib.sha1(content_key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{path_key}-{content_key}")
+
+    def _load_cached_frame(self, cache_path):
+        """Return the cached frame for cache_path, or None on a cache miss"""
+        if os.path.exists(cache_path + '.parquet'):
+            return pd.read_parquet(cache_path + '.parquet')
+        if os.path.exists(cache_path + '.pkl'):
+            return pd.read_pickle(cache_path + '.pkl')
+        return None
+
+    def _save_cached_frame(self, df, cache_path) -> None:
+        """Store the parsed frame and drop older cache entries of the same workbook"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path_key = os.path.basename(cache_path).split('-')[0]
+        for filename in os.listdir(self.cache_dir):
+            if filename.startswith(path_key + '-'):
+                os.remove(os.path.join(self.cache_dir, filename))
+        if importlib.util.find_spec('pyarrow'):
+            try:
+                df.to_parquet(cache_path + '.parquet.tmp')
+                os.replace(cache_path + '.parquet.tmp', cache_path + '.parquet')
+                return
+            except Exception:
+                # Mixed-type object columns cannot go to parquet, pickle keeps them as they are
+                if os.path.exists(cache_path + '.parquet.tmp'):
+                    os.remove(cache_path + '.parquet.tmp')
+        df.to_pickle(cache_path + '.pkl.tmp')
+        os.replace(cache_path + '.pkl.tmp', cache_path + '.pkl')
+
+    def _read_excel(self):
+        """Read and rename the whole workbook, through the frame cache when cache_dir is set"""
+        cache_path = self._excel_cache_path() if self.cache_dir else None
+        if cache_path:
+            df = self._load_cached_frame(cache_path)
+            if df is not None:
+                logger.info("Loaded cached frame for %s", self.input_file)
+                return df
+        if self.input_file.endswith(EXCEL_STREAMING_EXTENSIONS):
+            df = next(self._iter_excel_chunks())
+        else:
+            df = pd.read_excel(self.input_file).rename(columns=self.column_mapping)
+        if cache_path:
+            self._save_cached_frame(df, cache_path)
+        return df
+
+    def _iter_chunks(self, file=None):
+        """
+        Stream the CSV (or .xlsx) input, or a CSV file object, as cleaned, renamed DataFrame chunks
+        of self.chunksize rows
+        
+        Only one chunk (plus the rows of a screen still open at its end, see
+        _complete_screens) is held in memory at a time.
+        """
+        if file is None and self.input_file.endswith(EXCEL_STREAMING_EXTENSIONS):
+            yield from self._iter_excel_chunks(self.chunksize)
+            return
+        try:
+            self._describe_selection()
+            pushed_down = file is None and self._pushdown_selection() is not None
+            reader = pd.read_csv(self.input_file if file is None else file, chunksize=self.chunksize,
+                                 **self._csv_read_options(chunked=True, file=file))
+            total_rows = selected_rows = 0
+            with reader:
+                for chunk in reader:
+                    chunk = self._select_rows(chunk, chunked=True, pushed_down=pushed_down)
+                    selected_rows += len(chunk)
+                    chunk = self._clean_rows(chunk)
+                    total_rows += len(chunk)
+                    yield chunk
+            if self.row_selection_mode == 'indices':
+                # Chunks hold the selected rows in file order, so the missing ones are the last
+                missing = sorted(set(self.row_indices))[selected_rows:]
+                if missing:
+                    raise IndexError(f"Row indices out of range: {missing}")
+            logger.info("Found %d valid rows", total_rows)
+        except Exception as e:
+            logger.error("Error reading file: %s", e)
+            raise
+
+    def _use_stdlib_reader(self) -> bool:
+        """Whether convert() reads the CSV with the stdlib csv module instead of pandas"""
+        if not self.input_file.endswith('.csv') or self.incremental or self._streaming():
+            # Incremental hashes and chunked reads are pandas based
+            return False
+        if self.csv_engine == 'stdlib':
+            return True
+        return self.csv_engine == 'auto' and os.path.getsize(self.input_file) <= STDLIB_CSV_MAX_BYTES
+
+    def read_records(self, file=None) -> list:
+        """
+        Read the CSV with the stdlib csv module into renamed row dicts, without pandas
+        
+        Gives the rows read_file() would: only mapped columns, cells kept as strings,
+        NA_VALUES as None, blank lines skipped, rows without Screen_ID dropped, and the
+        row selection applied by position like df.iloc on a full read.
+        
+        Args:
+            file: Text or binary (UTF-8) file object to read instead of input_file
+        
+        Returns:
+            list: One dict per row, keyed by the mapped (JSON) column names
+        """
+        try:
+            self._describe_selection()
+            if file is None:
+                with open(self.input_file, 'r', encoding='utf-8', newline='') as f:
+                    rows = list(csv.reader(f))
+            elif isinstance(file.read(0), bytes):
+                text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+                rows = list(csv.reader(text))
+                # Leave the caller's file open
+                text.detach()
+            else:
+                rows = list(csv.reader(file))
+            # Skip the first line (comment) and use the second line as headers
+            header = rows[1] if len(rows) > 1 else []
+            # Like pandas, blank and whitespace-only lines are not rows
+            rows = [row for row in rows[2:] if row and (len(row) > 1 or row[0].strip(' \t'))]
+            positions = {}
+            for i, column in enumerate(header):
+                if column in self.column_mapping and self.column_mapping[column] not in positions:
+                    positions[self.column_mapping[column]] = i
+            self._validate_columns(positions)
+            rows = self._select_records(rows, positions['screen_template_id'])
+            records = []
+            for row in rows:
+                record = {}
+                for column, i in positions.items():
+                    value = row[i] if i < len(row) else None
+                    record[column] = None if value is None or value in NA_VALUES else value
+                # Remove rows with null Screen_ID
+                if record['screen_template_id'] is not None:
+                    records.append(record)
+            logger.info("Found %d valid rows", len(records))
+            return records
+        except Exception as e:
+            logger.error("Error reading file: %s", e)
+            raise
+
+    def _select_records(self, rows, id_position):
+        """Row selection of read_records (the stdlib counterpart of _select_rows)"""
+        mode = self.row_selection_mode
+        if mode == 'range':
+            start, end = self.row_range
+            return rows[start:end+1]
+        if mode == 'indices':
+            missing = [i for i in self.row_indices if not -len(rows) <= i < len(rows)]
+            if missing:
+                raise IndexError(f"Row indices out of range: {missing}")
+            return [rows[i] for i in self.row_indices]
+        if mode == 'ids':
+            wanted = set(self.row_ids)
+            return [row for row in rows if id_position < len(row) and row[id_position] in wanted]
+        return rows
+
+    def _streaming(self) -> bool:
+        """True when the input is read in chunks (chunksize set and a CSV or .xlsx input)"""
+        return bool(self.chunksize) and self.input_file.endswith(('.csv',) + EXCEL_STREAMING_EXTENSIONS)
+
+    def _iter_screen_frames(self):
+        """
+        Yield DataFrames that each hold complete screens
+        
+        Without chunksize (or for .xls input) this is the whole validated frame.
+        Small CSV inputs read by the stdlib reader (see _use_stdlib_reader) are
+        yielded as one list of row dicts from read_records() instead. In streaming
+        mode the chunks go through _complete_screens.
+        """
+        if self._use_stdlib_reader():
+            # Small CSV: plain row dicts, built by _build_screens_from_records
+            yield self.read_records()
+            return
+        if not self._streaming():
+            self.read_file()
+            if not self.validate_data():
+                raise ValueError("Data validation failed")
+            yield self.df
+            return
+        yield from self._complete_screens(self._iter_chunks())
+
+    def _complete_screens(self, chunks):
+        """
+        Regroup streamed chunks into DataFrames that each hold complete screens
+        
+        The rows of the last screen of every chunk are carried over to the next
+        chunk, so all rows of a screen whose rows cross a chunk boundary are built
+        together. Streaming expects the rows of a screen to be contiguous: rows of
+        a screen that reappear after the screen was emitted are dropped (and
+        counted in a warning) instead of writing it twice.
+        """
+        key = 'screen_template_id'
+        emitted = set()
+        late_rows = 0
+        carry = None
+        validated = False
+        for chunk in chunks:
+            if not validated:
+                self.validate_data(chunk)
+                validated = True
+            if carry is not None and not carry.empty:
+                # object dtype so all-NA columns of either side do not drive the result dtype
+                chunk = pd.concat([carry.astype(object), chunk.astype(object)])
+            if chunk.empty:
+                continue
+            # The last screen of the chunk may continue in the next one
+            open_rows = chunk[key] == chunk[key].iloc[-1]
+            carry = chunk[open_rows]
+            ready = chunk[~open_rows]
+            late = ready[key].isin(emitted)
+            late_rows += int(late.sum())
+            ready = ready[~late]
+            if not ready.empty:
+                emitted.update(ready[key].unique())
+                yield ready
+        if carry is not None and not carry.empty:
+            late = carry[key].isin(emitted)
+            late_rows += int(late.sum())
+            carry = carry[~late]
+            if not carry.empty:
+                yield carry
+        if late_rows:
+            logger.warning("Ignored %d rows of screens already written earlier in the stream; "
+                           "keep the rows of each Screen_ID together (or convert without chunksize)", late_rows)
+
+    def validate_data(self, df=None) -> bool:
         """
         Validate the input data structure
         
+        Args:
+            df (DataFrame): Frame to check, defaults to self.df (a chunk in streaming mode)
+        
         Returns:
             bool: True if validation passes, False otherwise
         """
-        missing_columns = [col for col in self.required_columns if col not in self.df.columns]
+        if df is None:
+            df = self.df
+        return self._validate_columns(df.columns)
+
+    def _validate_columns(self, columns) -> bool:
+        """Check that the (renamed) columns include every required column"""
+        missing_columns = [col for col in self.required_columns if col not in columns]
         if missing_columns:
-            print(f"Missing required columns: {missing_columns}")
+            logger.error("Missing required columns: %s", missing_columns)
             raise ValueError("Data validation failed: Missing required columns")
             
-        print("Data validation passed")
+        logger.debug("Data validation passed")
         return True
         
     def _get_value(self, row, *keys):
         """Get value from row using multiple possible keys"""
         for key in keys:
-            if key in row and pd.notna(row[key]):
+            if key in row and not _isna(row[key]):
                 return row[key]
         return ""
 
     def _process_value(self, value):
         """Process value to ensure correct type (bool if 'true'/'false')"""
-        if pd.isna(value):
+        if _isna(value):
             return None
         if isinstance(value, str):
             if value.strip().lower() == 'true':
@@ -230,14 +1077,16 @@ class ExcelToJsonConverter:
 
     def _format_section_name(self, section):
         """Convert section name to snake_case format"""
-        if pd.isna(section):
+        if _isna(section):
             return ""
+        # Numeric cells (e.g. from .xlsx) are used as text
+        section = str(section)
         # Convert to lowercase and replace spaces/special chars with underscores
         return section.lower().replace(' & ', '_and_').replace(' ', '_')
 
     def _process_component_name(self, name):
         """Process component name to get the base name without options and remove 'screen_' prefix"""
-        if pd.isna(name):
+        if _isna(name):
             return ""
         # Remove 'screen_' prefix if present
         name = name.replace('screen_', '')
@@ -249,7 +1098,7 @@ class ExcelToJsonConverter:
             name = name.rsplit('_', 1)[0]
         return name.strip()
 
-    def _create_children_for_select_cards(self, component_name, options):
+    def _create_children_for_select_cards(self, component_name, options, screen_id=""):
         """Create children structure for select cards based on options"""
         children = []
         for i, option in enumerate(options):
@@ -257,46 +1106,107 @@ class ExcelToJsonConverter:
             # Create child name based only on the option, without repeating the parent component name
             child_name = option.lower().replace(' ', '_')
             
-            child = {
-                "id": str(uuid.uuid4()),
-                "component_type": "select_card",
-                "name": child_name,
-                "is_array": False,
+            child = SELECT_CARD_TEMPLATE.copy()
+            child["id"] = self.ids.new(screen_id, component_name, i, child_name)
+            child["name"] = child_name
+            child["default_value"] = i == 0  # First option is true by default
+            child["value"] = i == 0
+            child["fields"] = [
+                {
+                    "id": self.ids.new(screen_id, component_name, i, child_name, "label"),
+                    "name": "label",
+                    "label": None,
+                    "value": option
+                },
+                {
+                    "id": self.ids.new(screen_id, component_name, i, child_name, "description"),
+                    "name": "description",
+                    "label": None,
+                    "value": ""
+                },
+                {
+                    "id": self.ids.new(screen_id, component_name, i, child_name, "image"),
+                    "name": "image",
+                    "label": None,
+                    "value": f"{i+1}_{child_name}.png"
+                }
+            ]
+            child["logic"] = []
+            child["children"] = []
+            children.append(child)
+        return children
+
+    def _resolve_component_type(self, component_type, data_format, options):
+        """Map Component type / Data Format to the JSON component_type"""
+        # Determine component type based on Component type first
+        mapped_type = self.component_type_mapping.get(component_type)
+        
+        # If not found in Component type, try with Data Format
+        if not mapped_type:
+            mapped_type = self.component_type_mapping.get(data_format)
+        
+        # If still not found, use original type
+        if not mapped_type:
+            mapped_type = component_type
+        
+        # If it's "text box" and has no options, force to input_text_area
+        if mapped_type == "text box" and not options:
+            mapped_type = "input_text_area"
+        return mapped_type
+
+    def _component_template(self, mapped_type):
+        """Cached skeleton of a component of the given type (copy it before use)"""
+        template = self._component_templates.get(mapped_type)
+        if template is None:
+            # Fields we know are required and their default values
+            template = {
+                "id": None,
+                "component_type": mapped_type,
+                "name": None,
+                "is_array": True if mapped_type in ["select_single_cards", "select_single_dropdown"] else False,
                 "is_private": False,
                 "is_editable": True,
                 "is_required": False,
                 "is_visible": True,
-                "default_value": i == 0,  # First option is true by default
-                "value": i == 0,
+                "default_value": None,
+                "value": None,
                 "suggested": None,
-                "validation": None,
-                "formatting": None,
+                "validation": {
+                    "value_type": "array" if mapped_type in ["select_single_cards", "select_single_dropdown"] else "text",
+                    "required": True
+                },
+                "formatting": [] if mapped_type.startswith('input_') else None,
                 "tooltip": None,
-                "fields": [
-                    {
-                        "id": str(uuid.uuid4()),
-                        "name": "label",
-                        "label": None,
-                        "value": option
-                    },
-                    {
-                        "id": str(uuid.uuid4()),
-                        "name": "description",
-                        "label": None,
-                        "value": ""
-                    },
-                    {
-                        "id": str(uuid.uuid4()),
-                        "name": "image",
-                        "label": None,
-                        "value": f"{i+1}_{child_name}.png"
-                    }
-                ],
+                "fields": [],
                 "logic": [],
                 "children": []
             }
-            children.append(child)
-        return children
+            self._component_templates[mapped_type] = template
+        return template
+
+    def _assemble_component(self, mapped_type, base_name, default_value, options_list, screen_id=""):
+        """Build a component object from already normalized values"""
+        template = self._component_template(mapped_type)
+        # Shallow copy keeps the key order; mutable members are replaced below
+        component_obj = template.copy()
+        component_obj["id"] = self.ids.new(screen_id, base_name)
+        component_obj["name"] = base_name
+        component_obj["default_value"] = default_value
+        component_obj["value"] = default_value
+        component_obj["validation"] = template["validation"].copy()
+        if template["formatting"] is not None:
+            component_obj["formatting"] = []
+        component_obj["fields"] = []
+        component_obj["logic"] = []
+        component_obj["children"] = []
+        
+        # Add children for select_single_cards and select_single_dropdown
+        if options_list is not None:
+            if mapped_type == "select_single_cards":
+                component_obj["children"] = self._create_children_for_select_cards(base_name, options_list, screen_id)
+            else:  # select_single_dropdown
+                component_obj["options"] = options_list
+        return component_obj
 
     def _create_components(self, row):
         """Create components structure as object, not array"""
@@ -309,76 +1219,31 @@ class ExcelToJsonConverter:
         if component_type and component_name:
             # Process component name
             base_name = self._process_component_name(component_name)
-            component_id = str(uuid.uuid4())
-            
-            # Determine component type based on Component type first
-            mapped_type = self.component_type_mapping.get(component_type)
-            
-            # If not found in Component type, try with Data Format
-            if not mapped_type:
-                mapped_type = self.component_type_mapping.get(data_format)
-            
-            # If still not found, use original type
-            if not mapped_type:
-                mapped_type = component_type
-            
-            # If it's "text box" and has no options, force to input_text_area
-            if mapped_type == "text box" and not options:
-                mapped_type = "input_text_area"
+            mapped_type = self._resolve_component_type(component_type, data_format, options)
             
             # For inputs, default_value and value must be null
             if mapped_type.startswith('input_'):
                 default_value = None
-                value = None
+            # For select_single_cards, default_value and value must be boolean
+            elif mapped_type == "select_single_cards":
+                default_value = True
             else:
-                # For select_single_cards, default_value and value must be boolean
-                if mapped_type == "select_single_cards":
-                    default_value = True
-                    value = True
-                else:
-                    default_value = self._process_value(self._get_value(row, 'default_value', 'Default Value'))
-                    value = default_value
+                default_value = self._process_value(self._get_value(row, 'default_value', 'Default Value'))
             
-            # Fields we know are required and their default values
-            component_obj = {
-                "id": component_id,
-                "component_type": mapped_type,
-                "name": base_name,
-                "is_array": True if mapped_type in ["select_single_cards", "select_single_dropdown"] else False,
-                "is_private": False,
-                "is_editable": True,
-                "is_required": False,
-                "is_visible": True,
-                "default_value": default_value,
-                "value": value,
-                "suggested": None,
-                "validation": {
-                    "value_type": "array" if mapped_type in ["select_single_cards", "select_single_dropdown"] else "text",
-                    "required": True
-                },
-                "formatting": [] if mapped_type.startswith('input_') else None,
-                "tooltip": None,
-                "fields": [],
-                "logic": [],
-                "children": []
-            }
-            
-            # Add children for select_single_cards and select_single_dropdown
+            options_list = None
             if mapped_type in ["select_single_cards", "select_single_dropdown"] and options:
                 options_list = [opt.strip() for opt in options.split(',')]
-                if mapped_type == "select_single_cards":
-                    component_obj["children"] = self._create_children_for_select_cards(base_name, options_list)
-                else:  # select_single_dropdown
-                    component_obj["options"] = options_list
             
-            components[base_name] = component_obj
+            screen_id = self._get_value(row, 'screen_template_id', 'Screen_ID')
+            components[base_name] = self._assemble_component(mapped_type, base_name, default_value,
+                                                             options_list, screen_id)
             
         return components
 
     def _process_scope(self, row):
         """Process scope field"""
         scope = self._get_value(row, 'scope', 'Scope')
-        if scope and not pd.isna(scope):
+        if scope and not _isna(scope):
             try:
                 # Try to parse as JSON
                 return json.loads(scope)
@@ -393,7 +1258,7 @@ class ExcelToJsonConverter:
         
         # Process Tip Link 1
         tip1 = self._get_value(row, 'tip_link_1', 'Tip Link 1 - Label : URL')
-        if tip1 and not pd.isna(tip1):
+        if tip1 and not _isna(tip1):
             try:
                 label, url = tip1.split(' : ')
                 # Remove https:// if present
@@ -407,7 +1272,7 @@ class ExcelToJsonConverter:
                 
         # Process Tip Link 2
         tip2 = self._get_value(row, 'tip_link_2', 'Tip Link 2 - Label : URL')
-        if tip2 and not pd.isna(tip2):
+        if tip2 and not _isna(tip2):
             try:
                 label, url = tip2.split(' : ')
                 # Remove https:// if present
@@ -432,7 +1297,7 @@ class ExcelToJsonConverter:
 
     def _process_options(self, options_str):
         """Process options string into array"""
-        if pd.isna(options_str):
+        if _isna(options_str):
             return []
         try:
             return [opt.strip() for opt in options_str.split(',')]
@@ -443,7 +1308,7 @@ class ExcelToJsonConverter:
         """Check which fields are missing from the CSV"""
         missing = []
         for csv_col, json_field in self.column_mapping.items():
-            if csv_col not in self.df.columns or pd.isna(row.get(csv_col, '')):
+            if csv_col not in self.df.columns or _isna(row.get(csv_col, '')):
                 missing.append({
                     "csv_column": csv_col,
                     "json_field": json_field,
@@ -451,98 +1316,902 @@ class ExcelToJsonConverter:
                 })
         return missing
 
-    def _create_json_structure(self, row):
-        """Create the JSON structure for a row, ensuring all fields are present"""
-        # Accept both screen_template_id and Screen_ID
-        screen_template_id = self._get_value(row, 'screen_template_id', 'Screen_ID')
-        name = self._get_value(row, 'name', 'Screen Name')
-        stage = self._get_value(row, 'stage', 'Stage')
-        title = self._get_value(row, 'title', 'Title')
-        label = self._get_value(row, 'label', 'Label')
-        description = self._get_value(row, 'description', 'Description')
-        section = self._format_section_name(self._get_value(row, 'section', 'Section'))
-        tips = self._get_value(row, 'tips', 'Tips')
-        small_print = self._get_value(row, 'small_print', 'Small Print')
-        internal_reference = self._get_value(row, 'internal_reference', 'References')
-        scope = self._process_scope(row)
-        tip_links = self._process_tip_links(row)
-        
+    def _assemble_screen(self, values, components):
+        """Build the screen object from already normalized screen-level values"""
         # Fields we know are required and their default values
-        json_data = {
-            "screen_template_id": screen_template_id,
-            "name": self._process_component_name(name),  # Remove 'screen_' prefix
+        return {
+            "screen_template_id": values['screen_template_id'],
+            "name": values['name'],
             "state": "draft",  # Default value
-            "title": title,
-            "label": label,
-            "description": description,
-            "stage": stage,    # Value from CSV
-            "section": section,
-            "scope": scope,
-            "tips": tips,
-            "tip_links": tip_links,
-            "small_print": small_print,
+            "title": values['title'],
+            "label": values['label'],
+            "description": values['description'],
+            "stage": values['stage'],    # Value from CSV
+            "section": values['section'],
+            "scope": values['scope'],
+            "tips": values['tips'],
+            "tip_links": values['tip_links'],
+            "small_print": values['small_print'],
             "is_required": True,
             "is_private": False,
             "is_editable": True,
             "internal": {
-                "references": internal_reference,
+                "references": values['internal_reference'],
                 "notes": ""  # Empty value for now
             },
-            "components": self._create_components(row)
+            "components": components
         }
-            
-        return json_data
 
-    def convert(self) -> None:
-        """Convert input data to JSON files"""
-        self.read_file()
+    def _create_json_structure(self, row):
+        """Create the JSON structure for a row, ensuring all fields are present"""
+        values = {
+            # Accept both screen_template_id and Screen_ID
+            'screen_template_id': self._get_value(row, 'screen_template_id', 'Screen_ID'),
+            'name': self._process_component_name(self._get_value(row, 'name', 'Screen Name')),  # Remove 'screen_' prefix
+            'stage': self._get_value(row, 'stage', 'Stage'),
+            'title': self._get_value(row, 'title', 'Title'),
+            'label': self._get_value(row, 'label', 'Label'),
+            'description': self._get_value(row, 'description', 'Description'),
+            'section': self._format_section_name(self._get_value(row, 'section', 'Section')),
+            'tips': self._get_value(row, 'tips', 'Tips'),
+            'small_print': self._get_value(row, 'small_print', 'Small Print'),
+            'internal_reference': self._get_value(row, 'internal_reference', 'References'),
+            'scope': self._process_scope(row),
+            'tip_links': self._process_tip_links(row),
+        }
+        return self._assemble_screen(values, self._create_components(row))
+
+    # --- BATCH (COLUMN-WISE) ENGINE ---
+    # The helpers below are the vectorized counterparts of _get_value,
+    # _process_component_name, _format_section_name, _process_tip_links and
+    # _process_value. They normalize whole columns at once so the per-screen
+    # work left in _build_screens is only dict assembly.
+
+    def _column(self, df, *keys):
+        """Vectorized _get_value: first non-null value among keys, '' otherwise"""
+        result = None
+        for key in keys:
+            if key not in df.columns:
+                continue
+            column = df[key].astype(object)
+            result = column if result is None else result.where(result.notna(), column)
+        if result is None:
+            return pd.Series("", index=df.index, dtype=object)
+        return result.where(result.notna(), "")
+
+    def _str(self, series):
+        """.str accessor that tolerates columns holding no strings at all (e.g. all numeric)"""
+        if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty', 'mixed', 'mixed-integer'):
+            return series.str
+        return pd.Series(None, index=series.index, dtype=object).str
+
+    def _normalize_component_names(self, names):
+        """Vectorized _process_component_name"""
+        names = names.str.replace('screen_', '', regex=False)
+        # If name contains commas, take only the first part
+        has_comma = names.str.contains(',', regex=False)
+        names = names.where(~has_comma, names.str.split(',', n=1).str[0].str.strip())
+        # If name ends with _yes or _no, remove that suffix
+        has_suffix = names.str.endswith('_yes') | names.str.endswith('_no')
+        names = names.where(~has_suffix, names.str.rsplit('_', n=1).str[0])
+        return names.str.strip()
+
+    def _map_distinct(self, name, *columns):
+        """
+        Apply the memoized transform `name` once per distinct value and broadcast it to every row
         
-        if not self.validate_data():
-            raise ValueError("Data validation failed")
+        The columns are factorized together, so the transform runs once per distinct
+        combination of values in the frame, and only on a miss of the bounded cache
+        shared by every frame of this converter and cleared by every convert() (see cache_info()).
         
-        # Group by screen_template_id to combine components
-        for screen_id, group in self.df.groupby('screen_template_id'):
-            screen_data = self._create_json_structure(group.iloc[0])
-            
-            # Save to JSON file (UTF-8, ensure_ascii=False)
-            output_file = os.path.join(self.output_dir, f"{screen_id}.json")
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(screen_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"Created JSON file: {output_file}")
+        Returns:
+            list: transform(*values) for every row, aligned with the columns
+        """
+        transform = self._normalize_caches[name]
+        codes = None
+        for column in columns:
+            column_codes, uniques = pd.factorize(column, use_na_sentinel=False)
+            codes = column_codes if codes is None else codes * len(uniques) + column_codes
+        if codes is None or not len(codes):
+            return []
+        # Codes are dense and numbered in order of first appearance
+        codes, _ = pd.factorize(codes)
+        first_rows = pd.Series(codes).drop_duplicates().index.tolist()
+        values = [column.tolist() for column in columns]
+        results = [transform(*(column[i] for column in values)) for i in first_rows]
+        return [results[code] for code in codes.tolist()]
+
+    def cache_info(self) -> dict:
+        """Hits, misses and size of every normalization cache"""
+        return {name: cache.cache_info()._asdict() for name, cache in self._normalize_caches.items()}
+
+    def _distinct_section_name(self, section):
+        """_format_section_name of one distinct Section value"""
+        return self._format_section_name(section)
+
+    def _distinct_component_type(self, component_type, data_format, has_options):
+        """_resolve_component_type of one distinct combination; returns (mapped_type, is_input)"""
+        mapped_type = self._resolve_component_type(component_type, data_format, has_options)
+        return mapped_type, isinstance(mapped_type, str) and mapped_type.startswith('input_')
+
+    def _distinct_options(self, options):
+        """Split one distinct Options value into a tuple of stripped options (None for non-strings)"""
+        if not isinstance(options, str):
+            return None
+        return tuple(opt.strip() for opt in options.split(','))
+
+    def _distinct_default_value(self, value):
+        """_process_value of one distinct Default Value ('' stays '')"""
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered == 'true':
+                return True
+            if lowered == 'false':
+                return False
+        return value
+
+    def _normalize_section_names(self, sections):
+        """Vectorized _format_section_name"""
+        return self._map_distinct('section', sections)
+
+    def _normalize_tip_links(self, tips):
+        """Vectorized split of a 'Label : URL' column into (label, url) pairs, None when invalid"""
+        parts = self._str(tips).split(' : ')
+        valid = (parts.str.len() == 2).tolist()
+        result = [None] * len(tips)
+        if any(valid):
+            pairs = parts[valid]
+            labels = pairs.str[0].str.strip()
+            # Remove https:// if present
+            urls = pairs.str[1].str.strip().str.replace('https://', '', regex=False).str.replace('http://', '', regex=False)
+            positions = [i for i, ok in enumerate(valid) if ok]
+            for i, label, url in zip(positions, labels.tolist(), urls.tolist()):
+                result[i] = (label, url)
+        return result
+
+    def _normalize_default_values(self, values):
+        """Vectorized _process_value: 'true'/'false' strings become booleans"""
+        return pd.Series(self._map_distinct('default_value', values), index=values.index, dtype=object)
+
+    def _normalize_frame(self, df):
+        """
+        Normalize every column needed to build screens, one column at a time
+        
+        Returns:
+            dict: Field name -> list of normalized values, aligned with df rows
+        """
+        section = self._column(df, 'section', 'Section')
+        scope = self._column(df, 'scope', 'Scope')
+        tip_link_1 = self._normalize_tip_links(self._column(df, 'tip_link_1', 'Tip Link 1 - Label : URL'))
+        tip_link_2 = self._normalize_tip_links(self._column(df, 'tip_link_2', 'Tip Link 2 - Label : URL'))
+
+        component_type = self._column(df, 'component_type', 'Component type')
+        component_name = self._column(df, 'component_name', 'Component(s) Name(s)')
+        data_format = self._column(df, 'validation', 'Data Format')
+        options = self._column(df, 'options', 'Options')
+        default_value = self._column(df, 'default_value', 'Default Value')
+
+        has_options = options.astype(bool)
+        has_component = component_type.astype(bool) & component_name.astype(bool)
+
+        # Determine component type based on Component type, then Data Format, then the original type
+        resolved = self._map_distinct('component_type', component_type, data_format, has_options)
+        mapped_type = pd.Series([pair[0] for pair in resolved], index=df.index, dtype=object)
+        is_input = pd.Series([pair[1] for pair in resolved], index=df.index, dtype=bool)
+
+        # Inputs get null defaults, select_single_cards True, everything else the coerced CSV value
+        default_value = self._normalize_default_values(default_value)
+        default_value = default_value.mask(mapped_type == "select_single_cards", True)
+        default_value = default_value.mask(is_input, None)
+
+        is_select = mapped_type.isin(["select_single_cards", "select_single_dropdown"]) & has_options
+        options_list = [None] * len(df)
+        if is_select.any():
+            positions = [i for i, ok in enumerate(is_select.tolist()) if ok]
+            for i, parts in zip(positions, self._map_distinct('options', options[is_select])):
+                # Each component gets its own list, the cached tuple is shared
+                options_list[i] = list(parts) if parts is not None else None
+
+        return {
+            'screen_template_id': self._column(df, 'screen_template_id', 'Screen_ID').tolist(),
+            'name': self._normalize_component_names(self._column(df, 'name', 'Screen Name')).tolist(),
+            'stage': self._column(df, 'stage', 'Stage').tolist(),
+            'title': self._column(df, 'title', 'Title').tolist(),
+            'label': self._column(df, 'label', 'Label').tolist(),
+            'description': self._column(df, 'description', 'Description').tolist(),
+            'section': self._normalize_section_names(section),
+            'tips': self._column(df, 'tips', 'Tips').tolist(),
+            'small_print': self._column(df, 'small_print', 'Small Print').tolist(),
+            'internal_reference': self._column(df, 'internal_reference', 'References').tolist(),
+            'scope': scope.tolist(),
+            'tip_link_1': tip_link_1,
+            'tip_link_2': tip_link_2,
+            'has_component': has_component.tolist(),
+            'component_name': self._normalize_component_names(component_name).tolist(),
+            'mapped_type': mapped_type.tolist(),
+            'default_value': default_value.tolist(),
+            'options_list': options_list,
+        }
+
+    def _group_rows(self, screen_ids, present):
+        """
+        Group row positions by screen id in one pass, without sorting
+        
+        Returns:
+            dict: screen id -> list of row positions, screens in order of first appearance
+        """
+        groups = {}
+        for i, (screen_id, ok) in enumerate(zip(screen_ids, present)):
+            if not ok:
+                continue
+            rows = groups.get(screen_id)
+            if rows is None:
+                groups[screen_id] = [i]
+            else:
+                rows.append(i)
+        return groups
+
+    def _build_screens(self, df):
+        """
+        Build screens for a DataFrame with the column-wise engine
+        
+        Rows are grouped by screen_template_id in a single pass over the (unsorted)
+        frame. Screen-level fields come from the first row of each screen and the
+        component of every row is added to the screen's components; if two rows
+        define a component with the same name, the first one is kept.
+        
+        Yields:
+            tuple: (screen_id, screen_data), screens in order of first appearance
+        """
+        key = 'screen_template_id' if 'screen_template_id' in df.columns else 'Screen_ID'
+        columns = self._normalize_frame(df)
+        groups = self._group_rows(df[key].tolist(), df[key].notna().tolist())
+
+        for screen_id, rows in groups.items():
+            i = rows[0]
+            tip_links = {}
+            for pair in (columns['tip_link_1'][i], columns['tip_link_2'][i]):
+                if pair is not None:
+                    label, url = pair
+                    tip_links[label] = {"label": label, "url": url}
+
+            scope = columns['scope'][i]
+            if scope:
+                try:
+                    # Try to parse as JSON
+                    scope = json.loads(scope)
+                except:
+                    # If not valid JSON, return empty object
+                    scope = {}
+            else:
+                scope = {}
 
-def main():
+            # Fold the component of every row of the screen into one components object
+            components = {}
+            for row in rows:
+                if not columns['has_component'][row]:
+                    continue
+                base_name = columns['component_name'][row]
+                if base_name in components:
+                    continue
+                components[base_name] = self._assemble_component(
+                    columns['mapped_type'][row], base_name,
+                    columns['default_value'][row], columns['options_list'][row], screen_id
+                )
+
+            values = {field: columns[field][i] for field in (
+                'screen_template_id', 'name', 'stage', 'title', 'label', 'description',
+                'section', 'tips', 'small_print', 'internal_reference'
+            )}
+            values['scope'] = scope
+            values['tip_links'] = tip_links
+            yield screen_id, self._assemble_screen(values, components)
+
+    def _build_screens_from_records(self, rows):
+        """
+        Build screens for row dicts of read_records with the per-row helpers (no pandas)
+        
+        Same grouping and merging as _build_screens: screen-level fields come from
+        the first row of each screen, the first component of a given name wins.
+        
+        Yields:
+            tuple: (screen_id, screen_data), screens in order of first appearance
+        """
+        groups = {}
+        for row in rows:
+            group = groups.get(row['screen_template_id'])
+            if group is None:
+                groups[row['screen_template_id']] = [row]
+            else:
+                group.append(row)
+
+        for screen_id, group in groups.items():
+            screen = self._create_json_structure(group[0])
+            components = screen['components']
+            for row in group[1:]:
+                base_name = self._process_component_name(self._get_value(row, 'component_name'))
+                if base_name not in components:
+                    components.update(self._create_components(row))
+            yield screen_id, screen
+
+    # --- INCREMENTAL MANIFEST ---
+
+    def _config_hash(self) -> str:
+        """Hash of everything besides the source rows that shapes the generated screens"""
+        config = {
+            'version': MANIFEST_VERSION,
+            'deterministic_ids': self.ids.deterministic,
+            'compact': self.serializer.compact,
+            'column_mapping': self.column_mapping,
+            'component_type_mapping': self.component_type_mapping,
+        }
+        if self.layout != 'flat':
+            # Screens move when the layout changes; flat runs keep their earlier hashes
+            config['layout'] = self.layout
+        if self.compression != 'none':
+            # Screen file names change with the compression
+            config['compression'] = self.compression
+        config = json.dumps(config, sort_keys=True)
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()
+
+    def _hash_screens(self, df) -> dict:
+        """
+        Content hash of the source rows of every screen in df
+        
+        Returns:
+            dict: screen_template_id -> hex digest of all the screen's rows, in order
+        """
+        key = 'screen_template_id' if 'screen_template_id' in df.columns else 'Screen_ID'
+        config_hash = self._config_hash().encode('ascii')
+        row_hashes = pd.util.hash_pandas_object(df, index=False).tolist()
+        rows = {}
+        for screen_id, row_hash in zip(df[key].tolist(), row_hashes):
+            if pd.isna(screen_id):
+                continue
+            rows.setdefault(screen_id, []).append(row_hash.to_bytes(8, 'little'))
+        return {
+            screen_id: hashlib.blake2b(config_hash + b''.join(hashes), digest_size=16).hexdigest()
+            for screen_id, hashes in rows.items()
+        }
+
+    def _load_manifest(self) -> dict:
+        """Read the screen hashes of the previous incremental run (hashes are None if the config changed)"""
+        manifest_file = os.path.join(self.output_dir, MANIFEST_FILE)
+        self._previous_output = (self.layout, self.compression)
+        if os.path.exists(manifest_file):
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            # Manifests that do not record them were written by flat, uncompressed runs
+            self._previous_output = (manifest.get('layout', 'flat'), manifest.get('compression', 'none'))
+            if manifest.get('config') == self._config_hash():
+                return manifest['screens']
+            logger.info("Mapping configuration changed, rebuilding every screen")
+            # Keep the known ids so screens are still reported as changed/removed
+            return {screen_id: None for screen_id in manifest['screens']}
+        return {}
+
+    def _save_manifest(self, screens: dict) -> None:
+        """Atomically replace the manifest with the current screen hashes"""
+        manifest_file = os.path.join(self.output_dir, MANIFEST_FILE)
+        tmp_file = manifest_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'config': self._config_hash(), 'layout': self.layout, 'compression': self.compression,
+                       'screens': screens}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, manifest_file)
+
+    def _remove_screen_files(self, screen_ids, layout=None, compression=None) -> None:
+        """Delete the files of earlier runs for these screens (written with layout/compression, default the current)"""
+        sharded = (layout or self.layout) == 'sharded'
+        compression = compression or self.compression
+        for screen_id in screen_ids:
+            output_file = os.path.join(self.output_dir, screen_relpath(screen_id, sharded, compression))
+            if os.path.exists(output_file):
+                os.remove(output_file)
+                if sharded and not os.listdir(os.path.dirname(output_file)):
+                    os.rmdir(os.path.dirname(output_file))
+
+    def _finish_incremental(self, previous: dict, current: dict, result: dict) -> None:
+        """Report added/changed/removed screens, drop removed and rejected files and store the new manifest"""
+        key_order = list(current)
+        result['added'] = [sid for sid in key_order if sid not in previous]
+        result['changed'] = [sid for sid in key_order if sid in previous and previous[sid] != current[sid]]
+        result['unchanged'] = [sid for sid in key_order if previous.get(sid) == current[sid]]
+        result['removed'] = []
+
+        if self._previous_output != (self.layout, self.compression):
+            # Every screen moved: delete the previous run's files and index instead of leaving them behind
+            layout, compression = self._previous_output
+            logger.info("Output changed from %s/%s to %s/%s, removing the previous files",
+                        layout, compression, self.layout, self.compression)
+            self._remove_screen_files(previous, layout=layout, compression=compression)
+            index_file = os.path.join(self.output_dir, INDEX_FILE)
+            if os.path.exists(index_file):
+                os.remove(index_file)
+
+        screens = dict(current)
+        if self.row_selection_mode == 'all':
+            # Only a full read can tell that a screen disappeared from the sheet
+            result['removed'] = [sid for sid in previous if sid not in current]
+            self._remove_screen_files(result['removed'])
+        else:
+            screens = {**previous, **current}
+        # A rejected screen must not leave its outdated file from an earlier run behind
+        self._remove_screen_files(result['rejected'])
+        # Screens that failed to write or validate are rebuilt next time
+        for screen_id in list(result['failed']) + list(result['rejected']):
+            screens.pop(screen_id, None)
+        self._save_manifest(screens)
+
+        logger.info("Incremental run: %d added, %d changed, %d removed, %d unchanged", len(result['added']),
+                    len(result['changed']), len(result['removed']), len(result['unchanged']))
+
+    def _save_index(self, entries: dict, removed: list) -> None:
+        """
+        Write INDEX_FILE: screen_template_id -> {'path', 'size', 'sha256'} of every screen file
+        
+        Incremental runs update the previous index with the screens written this time
+        and drop the removed (and rejected) ones.
+        """
+        index_file = os.path.join(self.output_dir, INDEX_FILE)
+        screens = {}
+        if self.incremental and os.path.exists(index_file):
+            with open(index_file, 'r', encoding='utf-8') as f:
+                screens = json.load(f)['screens']
+        screens.update(entries)
+        for screen_id in removed:
+            screens.pop(screen_id, None)
+        tmp_file = index_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'layout': self.layout, 'screens': screens}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, index_file)
+        logger.info("Index of %d screens written to %s", len(screens), index_file)
+
+    def _save_rejects(self, rejected: dict) -> None:
+        """Write the screens that failed schema validation to the rejects report"""
+        rejects_file = os.path.join(self.output_dir, REJECTS_FILE)
+        if not rejected:
+            # Drop the report of a previous run into the same (incremental) folder
+            if os.path.exists(rejects_file):
+                os.remove(rejects_file)
+            return
+        report = [{"screen_template_id": screen_id, "error": error} for screen_id, error in rejected.items()]
+        with open(rejects_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.warning("%d screens failed validation, see %s", len(rejected), rejects_file)
+
+    def _screens_of(self, frame):
+        """Build the screens of a DataFrame, or of the row dicts of read_records"""
+        if isinstance(frame, list):
+            return self._build_screens_from_records(frame)
+        return self._build_screens(frame)
+
+    def iter_screens(self, source=None):
+        """
+        Yield (screen_id, screen_data) lazily, without creating directories or writing files
+        
+        Args:
+            source: None to read input_file the way convert() does (streamed in chunks when
+                chunksize is set), a text or binary file object holding a CSV export (also
+                streamed when chunksize is set, otherwise read whole), or a DataFrame with the
+                sheet's source or already renamed columns. DataFrames are used as given:
+                select their rows before passing them.
+        
+        Yields:
+            tuple: (screen_id, screen_data), screens in order of first appearance
+        """
+        if source is None:
+            frames = self._iter_screen_frames()
+        elif hasattr(source, 'read') and self.chunksize:
+            frames = self._complete_screens(self._iter_chunks(source))
+        elif hasattr(source, 'read'):
+            frames = [self.read_records(source)]
+        else:
+            df = source
+            if 'Screen_ID' in df.columns:
+                # Source sheet columns: drop empty rows and rename like read_file()
+                df = self._clean_rows(df)
+            self.validate_data(df)
+            frames = [df]
+        for frame in frames:
+            yield from self._screens_of(frame)
+
+    def convert(self, validate: bool = False, schema_file: str = SCHEMA_FILE, metrics_file: str = None,
+                profile_file: str = None) -> dict:
+        """
+        Convert input data to JSON files
+        
+        Args:
+            validate (bool): Validate each screen dict against schema_file before writing it.
+                Invalid screens are not written but listed in REJECTS_FILE.
+            schema_file (str): JSON schema used when validate is True
+            metrics_file (str): If set, write the metrics report there (e.g. METRICS_FILE);
+                relative paths are inside the output directory
+            profile_file (str): If set, run under cProfile and dump the stats there (e.g.
+                PROFILE_FILE); relative paths are inside the output directory
+        
+        Returns:
+            dict: {'written': [paths], 'failed': {screen_id: error}} from the writer stage,
+                'rejected': {screen_id: validation error} and 'metrics' (see metrics.Metrics.report,
+                plus the hit/miss stats of the normalization caches under 'caches').
+                Incremental runs also list 'added', 'changed', 'removed' and 'unchanged' screen ids.
+        """
+        # Create output directory if it doesn't exist (parallel workers may share it)
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir, exist_ok=True)
+            logger.info("Output directory created: %s", self.output_dir)
+        if profile_file:
+            profile_file = os.path.join(self.output_dir, profile_file)
+        with profiled(profile_file):
+            result = self._convert(validate, schema_file)
+        if metrics_file:
+            metrics_file = os.path.join(self.output_dir, metrics_file)
+            self.metrics.save(metrics_file, input_file=self.input_file, output_dir=self.output_dir,
+                              caches=self.cache_info())
+            logger.info("Metrics written to %s", metrics_file)
+        return result
+
+    def _convert(self, validate, schema_file) -> dict:
+        """Run the conversion pipeline, recording stage timers and counts in self.metrics"""
+        metrics = self.metrics = Metrics()
+        # Settings such as component_type_mapping may have changed since the last run
+        for cache in self._normalize_caches.values():
+            cache.cache_clear()
+        validator = None
+        if validate:
+            # Imported here so jsonschema is only needed when validating
+            from validate_json import build_validator, load_schema, validate_data
+            with metrics.stage('load_schema'):
+                validator = build_validator(load_schema(schema_file))
+        rejected = {}
+
+        previous = self._load_manifest() if self.incremental else None
+        current = {}
+        if self.output_format == 'jsonl':
+            writer = BundleWriter(self.output_dir, os.path.splitext(os.path.basename(self.input_file))[0],
+                                  backend=self.serializer.backend, metrics=metrics, compression=self.compression)
+        else:
+            writer = ScreenWriter(self.output_dir, workers=self.writer_workers, serializer=self.serializer,
+                                  metrics=metrics, sharded=self.layout == 'sharded', compression=self.compression)
+        # Rows are only known up front when the whole input is read at once
+        progress = Progress(os.path.basename(self.input_file))
+        try:
+            # Build every screen from whole-column transforms (one screen per screen_template_id)
+            for frame in metrics.timed(self._iter_screen_frames(), 'read'):
+                metrics.count('rows', len(frame))
+                if not self._streaming():
+                    progress.total = len(frame)
+                if self.incremental:
+                    # Skip building and writing screens whose source rows did not change
+                    with metrics.stage('hash'):
+                        hashes = self._hash_screens(frame)
+                        current.update(hashes)
+                        stale = [sid for sid, digest in hashes.items() if previous.get(sid) != digest]
+                        rows = len(frame)
+                        frame = frame[frame['screen_template_id'].isin(stale)]
+                    progress.update(rows - len(frame))
+                if isinstance(frame, list):
+                    # Row dicts of the stdlib CSV reader
+                    screen_rows = collections.Counter(row['screen_template_id'] for row in frame)
+                else:
+                    screen_rows = frame['screen_template_id'].value_counts().to_dict()
+                # The first screen of a frame also carries the frame's column transforms
+                for screen_id, screen_data in metrics.timed(self._screens_of(frame), 'build', observe=True):
+                    progress.update(screen_rows.get(screen_id, 0))
+                    metrics.count('screens')
+                    metrics.count('components', len(screen_data['components']))
+                    if validator is not None:
+                        with metrics.stage('validate'):
+                            is_valid, error = validate_data(screen_data, validator)
+                        if not is_valid:
+                            rejected[screen_id] = error
+                            continue
+                    # Time blocked on a full writer queue
+                    with metrics.stage('submit'):
+                        writer.submit(screen_id, screen_data)
+        finally:
+            with metrics.stage('close'):
+                result = writer.close()
+        
+        result['rejected'] = rejected
+        if validator is not None:
+            self._save_rejects(rejected)
+        if result['failed']:
+            logger.warning("Failed to write %d of %d screens", len(result['failed']),
+                           len(result['failed']) + len(result['written']))
+        if self.incremental:
+            self._finish_incremental(previous, current, result)
+        if self.layout == 'sharded':
+            self._save_index(writer.entries, result.get('removed', []) + list(rejected))
+        progress.finish()
+        metrics.count('written', len(result['written']))
+        metrics.count('failed', len(result['failed']))
+        metrics.count('rejected', len(rejected))
+        result['metrics'] = dict(metrics.report(), caches=self.cache_info())
+        return result
+
+def iter_screens(source, **converter_options):
+    """
+    Yield (screen_id, screen_data) from a CSV/Excel path, a CSV file object or a DataFrame
+    
+    Nothing is written to disk, so callers can stream screens into their own sinks.
+    Paths are read like convert() reads them (pass chunksize to stream large files
+    in bounded memory); converter_options are ExcelToJsonConverter keyword arguments,
+    e.g. row_selection_mode='all' or deterministic_ids=True.
+    
+    Usage:
+        for screen_id, screen in iter_screens('csv-to-convert/screens.csv', row_selection_mode='all'):
+            queue.put(screen)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        yield from ExcelToJsonConverter(os.fspath(source), **converter_options).iter_screens()
+    else:
+        name = str(getattr(source, 'name', '<stream>'))
+        yield from ExcelToJsonConverter(name, **converter_options).iter_screens(source)
+
+def convert_file(input_file: str, output_dir: str, converter_options: dict = None,
+                 convert_options: dict = None) -> dict:
+    """
+    Convert a single input file (module level so it can run in a worker process)
+    
+    Args:
+        converter_options (dict): Keyword arguments for ExcelToJsonConverter
+        convert_options (dict): Keyword arguments for ExcelToJsonConverter.convert
+    
+    Returns:
+        dict: convert() result plus the 'output_dir' it wrote to
+    """
+    converter = ExcelToJsonConverter(input_file, output_dir, skiprows_real_csv=True, **(converter_options or {}))
+    result = converter.convert(**(convert_options or {}))
+    result['output_dir'] = converter.output_dir
+    return result
+
+def _scan_inputs(input_dir: str) -> dict:
+    """(mtime_ns, size) of every CSV in input_dir, skipping editor lock/temporary files"""
+    signatures = {}
+    with os.scandir(input_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.csv') and not entry.name.startswith(('.', '~$')) and entry.is_file():
+                stat = entry.stat()
+                signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return signatures
+
+class InputWatcher:
+    """
+    Debounced change detection of watch()
+    
+    poll() scans input_dir once. A new or modified file is converted once its size
+    and mtime have not changed for debounce seconds, so a burst of saves leads to a
+    single conversion. Existing files are converted on the first passes.
+    """
+
+    def __init__(self, input_dir: str, output_dir: str, converter_options: dict = None,
+                 convert_options: dict = None, debounce: float = WATCH_DEBOUNCE):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.converter_options = converter_options
+        self.convert_options = convert_options
+        self.debounce = debounce
+        self.converted = {}  # file -> signature of its last conversion
+        self.pending = {}    # file -> (signature, time it was first seen with that signature)
+
+    def poll(self, now: float = None) -> list:
+        """
+        Scan input_dir once and convert the files that settled
+        
+        Args:
+            now (float): time.monotonic() value of this pass (the current time by default)
+        
+        Returns:
+            list: Names of the files converted by this pass
+        """
+        now = time.monotonic() if now is None else now
+        try:
+            current = _scan_inputs(self.input_dir)
+        except OSError as e:
+            logger.error("Error scanning %s: %s", self.input_dir, e)
+            current = {}
+        done = []
+        for csv_file, signature in sorted(current.items()):
+            if self.converted.get(csv_file) == signature:
+                self.pending.pop(csv_file, None)
+            elif self.pending.get(csv_file, (None,))[0] != signature:
+                # New or changed again: (re)start the debounce
+                self.pending[csv_file] = (signature, now)
+            elif now - self.pending[csv_file][1] >= self.debounce:
+                del self.pending[csv_file]
+                self.converted[csv_file] = signature
+                done.append(csv_file)
+                logger.info("Converting %s", csv_file)
+                try:
+                    result = convert_file(os.path.join(self.input_dir, csv_file), self.output_dir,
+                                          self.converter_options, self.convert_options)
+                except Exception as e:
+                    # Keep watching; the file is retried once it is saved again
+                    logger.error("Error processing %s: %s", csv_file, e)
+                    continue
+                logger.info("%s: %d screens written to %s", csv_file, len(result['written']), result['output_dir'])
+        for csv_file in set(self.converted) - set(current):
+            del self.converted[csv_file]
+        for csv_file in set(self.pending) - set(current):
+            del self.pending[csv_file]
+        return done
+
+def watch(input_dir: str, output_dir: str, converter_options: dict = None, convert_options: dict = None,
+          poll_interval: float = WATCH_POLL_INTERVAL, debounce: float = WATCH_DEBOUNCE,
+          stop: threading.Event = None) -> None:
+    """
+    Keep converting the CSV files of input_dir as they are added or modified
+    
+    The directory is polled every poll_interval seconds (see InputWatcher).
+    Runs in this (warm) process until stop is set.
+    """
+    stop = stop or threading.Event()
+    watcher = InputWatcher(input_dir, output_dir, converter_options, convert_options, debounce)
+    logger.info("Watching '%s' for new or modified CSV files (Ctrl+C to stop)", input_dir)
+    while not stop.is_set():
+        watcher.poll()
+        stop.wait(poll_interval)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert screen CSV exports to JSON screen templates")
+    parser.add_argument('--input-dir', default="csv-to-convert", help="Directory with the CSV files to convert")
+    parser.add_argument('--output-dir', default="json", help="Base directory for the generated JSON")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of files converted in parallel (process pool); 1 converts sequentially")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream each CSV in chunks of this many rows")
+    parser.add_argument('--csv-engine', choices=['auto', 'stdlib', 'c', 'pyarrow', 'python'], default='auto',
+                        help="CSV parser; 'auto' reads small files with the stdlib csv module (no pandas "
+                             "import) and larger ones with pyarrow when installed, else pandas' 'c' parser")
+    parser.add_argument('--rows', choices=['all', 'range', 'indices', 'ids'], default=None,
+                        help="Row selection mode (default: ROW_SELECTION_MODE)")
+    parser.add_argument('--row-range', type=int, nargs=2, metavar=('START', 'END'), default=None,
+                        help="First and last row index for --rows range")
+    parser.add_argument('--row-indices', type=int, nargs='+', default=None, help="Row indices for --rows indices")
+    parser.add_argument('--row-ids', nargs='+', default=None, help="Screen_IDs for --rows ids")
+    parser.add_argument('--writer-workers', type=int, default=4,
+                        help="Threads serializing and writing screen files for each input file")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Write to a stable folder per CSV and only rebuild screens that changed")
+    parser.add_argument('--deterministic-ids', action='store_true',
+                        help="Derive component ids from screen/component names so reruns keep the same ids")
+    parser.add_argument('--validate', action='store_true',
+                        help="Validate each screen against the schema before writing it; invalid screens go to _rejects.json")
+    parser.add_argument('--schema', default=SCHEMA_FILE, help="JSON schema used by --validate")
+    parser.add_argument('--format', choices=['files', 'jsonl'], default='files',
+                        help="One JSON file per screen, or one JSON Lines bundle with an offset index per CSV")
+    parser.add_argument('--compact', action='store_true', help="Write screen files without indentation")
+    parser.add_argument('--layout', choices=['flat', 'sharded'], default='flat',
+                        help=f"Put screen files in hash-prefixed subdirectories and list them in {INDEX_FILE}")
+    parser.add_argument('--compression', choices=['none', 'gzip', 'zstd'], default='none',
+                        help="Compress screen files / bundles while writing them (.gz, .zst; zstd needs "
+                             "the zstandard package)")
+    parser.add_argument('--json-backend', choices=['auto', 'orjson', 'json'], default='auto',
+                        help="JSON encoder; 'auto' uses orjson when it is installed")
+    parser.add_argument('--metrics', nargs='?', const=METRICS_FILE, default=None, metavar='FILE',
+                        help=f"Write stage timings, counts, latency histograms and peak memory of each "
+                             f"conversion to FILE in its output directory (default name: {METRICS_FILE})")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_FILE, default=None, metavar='FILE',
+                        help=f"Run each conversion under cProfile and dump the stats to FILE in its "
+                             f"output directory (default name: {PROFILE_FILE})")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and convert CSV files as they are added or modified "
+                             "(one at a time; combine with --incremental to update files in place)")
+    parser.add_argument('--poll-interval', type=float, default=WATCH_POLL_INTERVAL,
+                        help="Seconds between two scans of --input-dir in --watch mode")
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE,
+                        help="Seconds a file must stay unchanged before --watch converts it")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument('-v', '--verbose', action='store_true',
+                           help="Log every written screen file (slows down large runs)")
+    verbosity.add_argument('-q', '--quiet', action='store_true', help="Only log warnings and errors")
+    args = parser.parse_args(argv)
+    if args.csv_engine == 'pyarrow' and args.chunksize:
+        parser.error("--csv-engine pyarrow cannot read in chunks; use --csv-engine c with --chunksize")
+    log_level = -1 if args.quiet else 1 if args.verbose else 0
+    setup_logging(log_level)
+    converter_options = {
+        'chunksize': args.chunksize,
+        'csv_engine': args.csv_engine,
+        'row_selection_mode': args.rows,
+        'row_range': args.row_range,
+        'row_indices': args.row_indices,
+        'row_ids': args.row_ids,
+        'writer_workers': args.writer_workers,
+        'incremental': args.incremental,
+        'deterministic_ids': args.deterministic_ids,
+        'output_format': args.format,
+        'compact': args.compact,
+        'json_backend': args.json_backend,
+        'layout': args.layout,
+        'compression': args.compression,
+    }
+    convert_options = {
+        'validate': args.validate,
+        'schema_file': args.schema,
+        'metrics_file': args.metrics,
+        'profile_file': args.profile,
+    }
+    
     # Configuration
-    input_dir = "csv-to-convert"
-    base_output_dir = "json"
+    input_dir = args.input_dir
+    base_output_dir = args.output_dir
     
     # Check if input directory exists
     if not os.path.exists(input_dir):
-        print(f"Error: Directory '{input_dir}' does not exist")
-        return
+        logger.error("Error: Directory '%s' does not exist", input_dir)
+        return 1
+
+    if args.watch:
+        try:
+            watch(input_dir, base_output_dir, converter_options, convert_options,
+                  poll_interval=args.poll_interval, debounce=args.debounce)
+        except KeyboardInterrupt:
+            logger.info("Stopped watching '%s'", input_dir)
+        return 0
         
     # Find all CSV files in the input directory
-    csv_files = [f for f in os.listdir(input_dir) if f.endswith('.csv')]
+    csv_files = sorted(f for f in os.listdir(input_dir) if f.endswith('.csv'))
     
     if not csv_files:
-        print(f"Error: No CSV files found in '{input_dir}'")
-        return
+        logger.error("Error: No CSV files found in '%s'", input_dir)
+        return 1
         
-    print(f"Found {len(csv_files)} CSV files:")
+    logger.info("Found %d CSV files:", len(csv_files))
     for i, file in enumerate(csv_files, 1):
-        print(f"{i}. {file}")
+        logger.info("%d. %s", i, file)
+    
+    succeeded = {}
+    failed = {}
+    if args.workers > 1:
+        # Convert files in a process pool, one file per task
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=setup_logging,
+                                 initargs=(log_level,)) as executor:
+            futures = {
+                executor.submit(convert_file, os.path.join(input_dir, csv_file), base_output_dir,
+                                converter_options, convert_options): csv_file
+                for csv_file in csv_files
+            }
+            for future in as_completed(futures):
+                csv_file = futures[future]
+                try:
+                    succeeded[csv_file] = future.result()
+                except Exception as e:
+                    logger.error("Error processing %s: %s", csv_file, e)
+                    failed[csv_file] = str(e)
+    else:
+        # Process each CSV file
+        for csv_file in csv_files:
+            input_file = os.path.join(input_dir, csv_file)
+            logger.info("Processing file: %s", csv_file)
+            
+            try:
+                succeeded[csv_file] = convert_file(input_file, base_output_dir, converter_options, convert_options)
+            except Exception as e:
+                logger.error("Error processing %s: %s", csv_file, e)
+                failed[csv_file] = str(e)
+                continue
     
-    # Process each CSV file
+    # Log summary
+    counts = [result['metrics']['counts'] for result in succeeded.values()]
+    logger.info("Conversion Summary:")
+    logger.info("Total files: %d", len(csv_files))
+    logger.info("Converted files: %d", len(succeeded))
+    logger.info("Failed files: %d", len(failed))
+    logger.info("Rows: %d, screens written: %d, bytes written: %d",
+                sum(c.get('rows', 0) for c in counts), sum(c.get('written', 0) for c in counts),
+                sum(c.get('bytes', 0) for c in counts))
     for csv_file in csv_files:
-        input_file = os.path.join(input_dir, csv_file)
-        print(f"\nProcessing file: {csv_file}")
-        
-        try:
-            converter = ExcelToJsonConverter(input_file, base_output_dir, skiprows_real_csv=True)
-            converter.convert()
-        except Exception as e:
-            print(f"Error processing {csv_file}: {str(e)}")
-            continue
+        if csv_file in failed:
+            logger.warning("   %s: %s", csv_file, failed[csv_file])
+        else:
+            if succeeded[csv_file]['failed']:
+                logger.warning("   %s: %d screens could not be written", csv_file, len(succeeded[csv_file]['failed']))
+            if succeeded[csv_file]['rejected']:
+                logger.warning("   %s: %d screens failed schema validation", csv_file,
+                               len(succeeded[csv_file]['rejected']))
+    failed_screens = any(result['failed'] or result['rejected'] for result in succeeded.values())
+    return 1 if failed or failed_screens else 0
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import bisect
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource  # Unix only, used for the peak memory of the process
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between two progress lines
+PROGRESS_INTERVAL = 2.0
+
+# Upper bounds (milliseconds) of the latency histogram buckets; one more bucket holds the rest
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where getrusage is unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
+
+def setup_logging(verbosity=0):
+    """Configure console logging for the command line tools.
+
+    verbosity: -1 only shows warnings and errors, 0 progress and summaries, 1 every file.
+    """
+    level = {-1: logging.WARNING, 0: logging.INFO}.get(verbosity, logging.DEBUG)
+    logging.basicConfig(level=level, format='%(message)s')
+    logging.getLogger().setLevel(level)
+
+def format_duration(seconds):
+    """Short human readable duration, e.g. '42s' or '3m05s'."""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+@contextmanager
+def profiled(profile_file=None):
+    """Run the block under cProfile and dump the stats to profile_file (does nothing if None)."""
+    if not profile_file:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(profile_file)
+        logger.info("Profile written to %s (inspect with: python -m pstats %s)", profile_file, profile_file)
+
+class Histogram:
+    """Fixed-bucket latency histogram (constant memory however many samples)."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds):
+        ms = seconds * 1000
+        self.buckets[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def report(self):
+        labels = [f"<={bound}ms" for bound in self.bounds] + [f">{self.bounds[-1]}ms"]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 4) if self.count else None,
+            'max_ms': round(self.max_ms, 4),
+            'buckets': dict(zip(labels, self.buckets)),
+        }
+
+class Metrics:
+    """Stage timers, counters and latency histograms of one run.
+
+    Safe to update from several threads (the writer stage records from its pool).
+    Stage times of threaded stages are summed over threads, so they can exceed
+    the wall time of the run.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counts = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            stage['seconds'] += seconds
+            stage['calls'] += 1
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        """Add one latency sample to the histogram called name."""
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        """Charge the time spent in the block to stage name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, iterable, name, observe=False):
+        """Iterate, charging the time spent producing each item to stage name.
+
+        With observe=True every item's time is also a sample of the histogram called name.
+        Time spent by the caller between items is not charged.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            elapsed = time.perf_counter() - start
+            self.add_time(name, elapsed)
+            if observe:
+                self.observe(name, elapsed)
+            yield item
+
+    def merge(self, report):
+        """Add the stage times and counts of another Metrics' report (e.g. from a worker process)."""
+        with self.lock:
+            for name, other in report['stages'].items():
+                stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+                stage['seconds'] += other['seconds']
+                stage['calls'] += other['calls']
+            for name, n in report['counts'].items():
+                self.counts[name] = self.counts.get(name, 0) + n
+
+    def report(self):
+        """Plain dict of everything recorded so far (JSON serializable, picklable)."""
+        with self.lock:
+            return {
+                'wall_seconds': round(time.perf_counter() - self.started, 6),
+                'stages': {name: {'seconds': round(stage['seconds'], 6), 'calls': stage['calls']}
+                           for name, stage in self.stages.items()},
+                'counts': dict(self.counts),
+                'latency': {name: histogram.report() for name, histogram in self.histograms.items()},
+                'peak_rss_mb': peak_rss_mb(),
+            }
+
+    def save(self, metrics_file, **extra):
+        """Write the report (plus extra top-level fields) to metrics_file and return it."""
+        report = dict(extra, **self.report())
+        tmp_file = metrics_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, metrics_file)
+        return report
+
+class Progress:
+    """Throttled progress line: rate, and percentage plus ETA when the total is known.
+
+    update() is cheap enough to call per item; a line is logged at most once every
+    interval seconds, so high-volume runs are not slowed down by console output.
+    """
+
+    def __init__(self, label, total=None, unit='rows', interval=PROGRESS_INTERVAL, log=logger):
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.log = log
+        self.done = 0
+        self.started = self.last = time.perf_counter()
+
+    def update(self, n=1):
+        self.done += n
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.log.info("%s", self.line(now))
+
+    def line(self, now=None):
+        """The progress text for the current state."""
+        elapsed = (now or time.perf_counter()) - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        if self.total:
+            eta = format_duration(max(self.total - self.done, 0) / rate) if rate else '?'
+            return (f"{self.label}: {self.done}/{self.total} {self.unit} ({self.done / self.total:.0%}), "
+                    f"{rate:,.0f} {self.unit}/s, ETA {eta}")
+        return f"{self.label}: {self.done} {self.unit}, {rate:,.0f} {self.unit}/s"
+
+    def finish(self):
+        """Log the final count, elapsed time and average rate."""
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        self.log.info("%s: %d %s in %s (%s %s/s)", self.label, self.done, self.unit,
+                      format_duration(elapsed), f"{rate:,.0f}", self.unit)
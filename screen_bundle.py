@@ -0,0 +1,76 @@
+import json
+import mmap
+import os
+import compressed
+
+# Sidecar index of a bundle: {"bundle": <file name>, "compression": 'none' | 'gzip' | 'zstd',
+# "screens": {screen_template_id: [offset, length]}}; offsets of compressed bundles point at members
+INDEX_SUFFIX = '.idx'
+
+def index_path(bundle_file):
+    """Path of the sidecar index of a JSON Lines bundle."""
+    return bundle_file + INDEX_SUFFIX
+
+class ScreenBundle:
+    """Random access to the screens of a JSON Lines bundle written by ExcelToJsonConverter.
+
+    The bundle is memory-mapped and the sidecar index gives the byte offset and
+    length of every screen, so get() parses only the requested line. In compressed
+    bundles (.jsonl.gz / .jsonl.zst) each line is its own gzip member or zstd frame
+    and only that member is decompressed.
+
+    Usage:
+        with ScreenBundle('json/2024-01-01_00-00-00/screens.jsonl') as bundle:
+            screen = bundle['first_loan_type']
+    """
+
+    def __init__(self, bundle_file, index_file=None):
+        self.bundle_file = bundle_file
+        with open(index_file or index_path(bundle_file), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.index = index['screens']
+        # Indexes written before compression support have no 'compression' key
+        self.compression = index.get('compression', 'none')
+        self._file = open(bundle_file, 'rb')
+        # mmap cannot map an empty file
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def get_bytes(self, screen_id):
+        """Raw (decompressed) JSON bytes of one screen."""
+        offset, length = self.index[screen_id]
+        return compressed.decompress(self._map[offset:offset + length], self.compression)
+
+    def get(self, screen_id, default=None):
+        """Parsed screen dict, or default if the bundle has no such screen."""
+        if screen_id not in self.index:
+            return default
+        return json.loads(self.get_bytes(screen_id))
+
+    def __getitem__(self, screen_id):
+        return json.loads(self.get_bytes(screen_id))
+
+    def __contains__(self, screen_id):
+        return screen_id in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def items(self):
+        """Iterate (screen_id, screen dict) pairs in bundle order."""
+        for screen_id in self.index:
+            yield screen_id, self[screen_id]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
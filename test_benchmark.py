@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import benchmark
+from excel_to_json_converter import ExcelToJsonConverter
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_generated_sheet_converts(self):
+        """Synthetic sheets go through the real reader and screen builder"""
+        for fmt in ('csv', 'xlsx'):
+            sheet = benchmark.generate_sheet(os.path.join(self.root, f'sheet.{fmt}'), 50, fmt)
+            converter = ExcelToJsonConverter(sheet, os.path.join(self.root, 'json'), row_selection_mode='all')
+            converter.read_file()
+            screens = dict(converter._build_screens(converter.df))
+            self.assertEqual(len(converter.df), 50)
+            self.assertTrue(screens)
+            self.assertTrue(any(screen['tip_links'] for screen in screens.values()))
+
+    def test_compare_results_flags_regressions(self):
+        """Only stages slower than tolerance and noise floor are reported"""
+        baseline = {'results': {'csv-1000': {'read_file': {'seconds': 1.0}, 'build': {'seconds': 0.01}}}}
+        current = {'results': {'csv-1000': {'read_file': {'seconds': 1.5}, 'build': {'seconds': 0.03},
+                                            'counts': {'rows': 1000, 'screens': 500}}}}
+        self.assertEqual(benchmark.compare_results(current, baseline), [('csv-1000', 'read_file', 1.0, 1.5)])
+        self.assertEqual(benchmark.compare_results(current, baseline, tolerance=1.0), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
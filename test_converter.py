@@ -1,8 +1,57 @@
 import unittest
 import pandas as pd
+import gzip
+import hashlib
+import importlib.util
+import io
 import json
 import os
-from excel_to_json_converter import ExcelToJsonConverter
+import shutil
+import subprocess
+import sys
+import tempfile
+import uuid
+from unittest import mock
+import compressed
+import excel_to_json_converter
+import validate_json
+from excel_to_json_converter import ExcelToJsonConverter, JsonSerializer
+from screen_bundle import ScreenBundle
+from validate_json import iter_json_files
+
+
+def strip_ids(value):
+    """Drop generated uuid fields so two conversions can be compared"""
+    if isinstance(value, dict):
+        return {k: strip_ids(v) for k, v in value.items() if k != 'id'}
+    if isinstance(value, list):
+        return [strip_ids(v) for v in value]
+    return value
+
+
+def sample_screens_frame():
+    """Renamed frame covering the mapping edge cases of the converter"""
+    return pd.DataFrame({
+        'screen_template_id': ['screen_b', 'screen_a', 'screen_b', 'screen_c', 'screen_d', None],
+        'name': ['screen_loan_type_yes', 'screen_zip, other', 'ignored', 'screen_amount', None, 'orphan'],
+        'stage': ['basics', 'basics', 'basics', 'offer', None, 'x'],
+        'title': ['Loan?', 'Zip', 'dup', 'Amount', 'Empty', 'x'],
+        'label': ['Loan', 'Zip', 'dup', 'Amount', None, 'x'],
+        'description': ['Pick one', 'Enter zip', 'dup', 'How much', None, 'x'],
+        'component_type': ['Choice', 'Unknown', 'Text', 'Dropdown', None, 'Text'],
+        'component_name': ['screen_loan_type_no', 'zip_code', 'other', 'amount, extra', None, 'x'],
+        'options': ['Conventional, FHA , VA', None, None, 'Low,High', None, None],
+        'validation': [None, 'Zip Code Number', None, None, None, None],
+        'default_value': ['x', 'y', None, ' TRUE ', None, None],
+        'tips': ['Tip', None, None, 'Tip 2', None, None],
+        'small_print': [None, 'Small', None, None, None, None],
+        'internal_reference': ['REF-1', None, None, None, None, None],
+        'scope': ['{"funds_type_loan": true}', 'not json', None, '', None, None],
+        'section': ['Funds & Financing', 'Property Info', None, None, None, None],
+        'tip_link_1': ['Loan Types : https://example.com/loans', 'broken', None, 'A : http://a.com', None, None],
+        'tip_link_2': [None, 'Zip : https://zip.com', None, 'A : b.com', None, None],
+    })
+
 
 class TestExcelToJsonConverter(unittest.TestCase):
     def setUp(self):
@@ -105,5 +154,976 @@ class TestExcelToJsonConverter(unittest.TestCase):
         self.assertEqual(component['min_value'], '0')
         self.assertEqual(component['max_value'], '100')
         
+
+def write_source_csv(path, df, converter):
+    """Write a renamed frame back as a real export: comment line, then source headers"""
+    source_columns = {v: k for k, v in converter.column_mapping.items()}
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('exported sheet\n')
+        df.rename(columns=source_columns).to_csv(f, index=False)
+
+
+def read_output_dir(output_dir):
+    """Load every generated screen of a run, keyed by file name"""
+    screens = {}
+    for filename in sorted(os.listdir(output_dir)):
+        with open(os.path.join(output_dir, filename), encoding='utf-8') as f:
+            screens[filename] = strip_ids(json.load(f))
+    return screens
+
+
+class SampleCsvTestCase(unittest.TestCase):
+    """Temporary root holding screens.csv, a source export of sample_source_frame()"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.csv_file = os.path.join(self.root, 'screens.csv')
+        self.write_csv(self.sample_source_frame())
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def sample_source_frame(self):
+        return sample_screens_frame()
+
+    def write_csv(self, df):
+        write_source_csv(self.csv_file, df, ExcelToJsonConverter(self.csv_file, self.root))
+
+    def make_converter(self, output_dir, **options):
+        """Converter of screens.csv processing every row"""
+        return ExcelToJsonConverter(self.csv_file, output_dir, row_selection_mode='all', **options)
+
+
+class TestBatchScreenBuilder(unittest.TestCase):
+    def setUp(self):
+        self.output_root = tempfile.mkdtemp()
+        self.converter = ExcelToJsonConverter('unused.csv', self.output_root)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_root)
+
+    def test_matches_row_path(self):
+        """Column-wise engine produces the same screens as the per-row path, all rows merged"""
+        df = sample_screens_frame()
+        expected = []
+        for screen_id, group in df.groupby('screen_template_id', sort=False):
+            screen = self.converter._create_json_structure(group.iloc[0])
+            for _, row in group.iloc[1:].iterrows():
+                for name, component in self.converter._create_components(row).items():
+                    screen['components'].setdefault(name, component)
+            expected.append((screen_id, strip_ids(screen)))
+        actual = [
+            (screen_id, strip_ids(screen))
+            for screen_id, screen in self.converter._build_screens(df)
+        ]
+        self.assertEqual(actual, expected)
+
+    def test_distinct_values_are_transformed_once(self):
+        """Repeated values hit the bounded normalization cache instead of being transformed again"""
+        df = pd.concat([sample_screens_frame()] * 50, ignore_index=True)
+        first = [screen for _, screen in self.converter._build_screens(df)]
+        with mock.patch.object(self.converter, '_resolve_component_type') as resolve:
+            second = [screen for _, screen in self.converter._build_screens(df)]
+        resolve.assert_not_called()
+        self.assertEqual(strip_ids(second), strip_ids(first))
+        info = self.converter.cache_info()
+        self.assertEqual(info['section']['misses'], 3)
+        self.assertEqual(info['section']['hits'], 3)
+        self.assertEqual(info['options']['maxsize'], excel_to_json_converter.NORMALIZE_CACHE_SIZE)
+
+    def test_mapping_changes_between_runs_take_effect(self):
+        """Every convert() starts with empty caches, so an edited component_type_mapping is applied"""
+        csv_file = os.path.join(self.output_root, 'screens.csv')
+        write_source_csv(csv_file, sample_screens_frame(), self.converter)
+        converter = ExcelToJsonConverter(csv_file, self.output_root, row_selection_mode='all', csv_engine='c')
+
+        def amount_type():
+            [path] = [p for p in converter.convert()['written'] if os.path.basename(p) == 'screen_c.json']
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)['components']['amount']['component_type']
+
+        self.assertEqual(amount_type(), 'select_single_dropdown')
+        converter.component_type_mapping['Dropdown'] = 'select_single_list'
+        self.assertEqual(amount_type(), 'select_single_list')
+
+    def test_normalized_values(self):
+        """Spot-check a few normalized fields"""
+        screens = dict(self.converter._build_screens(sample_screens_frame()))
+        loan = screens['screen_b']
+        self.assertEqual(loan['name'], 'loan_type')
+        self.assertEqual(loan['section'], 'funds_and_financing')
+        self.assertEqual(loan['tip_links'], {'Loan Types': {'label': 'Loan Types', 'url': 'example.com/loans'}})
+        children = loan['components']['loan_type']['children']
+        self.assertEqual([c['name'] for c in children], ['conventional', 'fha', 'va'])
+        amount = screens['screen_c']['components']['amount']
+        self.assertEqual(amount['options'], ['Low', 'High'])
+        self.assertIs(amount['default_value'], True)
+        self.assertEqual(screens['screen_a']['components']['zip_code']['component_type'], 'input_text_line')
+
+
+def collect_ids(value):
+    """Every generated id of a screen, depth first"""
+    if isinstance(value, dict):
+        ids = [value['id']] if 'id' in value else []
+        return ids + [i for k, v in value.items() if k != 'id' for i in collect_ids(v)]
+    if isinstance(value, list):
+        return [i for v in value for i in collect_ids(v)]
+    return []
+
+
+class TestComponentIds(unittest.TestCase):
+    def setUp(self):
+        self.output_root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_root)
+
+    def build(self, **kwargs):
+        converter = ExcelToJsonConverter('unused.csv', self.output_root, **kwargs)
+        return dict(converter._build_screens(sample_screens_frame()))
+
+    def test_random_ids_are_unique_uuid4(self):
+        """Bulk-generated ids are distinct version 4 uuids"""
+        ids = collect_ids(self.build())
+        self.assertEqual(len(ids), 16)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(uuid.UUID(i).version == 4 for i in ids))
+        self.assertNotEqual(ids, collect_ids(self.build()))
+
+    def test_deterministic_ids_are_stable(self):
+        """uuid5 mode gives the same ids on every run, still unique within a run"""
+        first = collect_ids(self.build(deterministic_ids=True))
+        self.assertEqual(first, collect_ids(self.build(deterministic_ids=True)))
+        self.assertEqual(len(set(first)), len(first))
+
+    def test_templates_are_not_shared(self):
+        """Components copied from the same cached template do not share mutable members"""
+        converter = ExcelToJsonConverter('unused.csv', self.output_root)
+        first = converter._assemble_component('input_text_line', 'a', None, None)
+        second = converter._assemble_component('input_text_line', 'b', None, None)
+        first['validation']['required'] = False
+        first['formatting'].append('x')
+        first['children'].append('x')
+        self.assertEqual(second['validation'], {'value_type': 'text', 'required': True})
+        self.assertEqual(second['formatting'], [])
+        self.assertEqual(second['children'], [])
+
+
+class TestJsonSerializer(unittest.TestCase):
+    def setUp(self):
+        self.output_root = tempfile.mkdtemp()
+        converter = ExcelToJsonConverter('unused.csv', self.output_root)
+        self.screens = [screen for _, screen in converter._build_screens(sample_screens_frame())]
+        self.screens.append({"text": "ñandú \u2028 \"quoted\"", "big": 2 ** 70, "values": [1.5, None, {}]})
+
+    def tearDown(self):
+        shutil.rmtree(self.output_root)
+
+    def test_backends_produce_identical_bytes(self):
+        """Every backend matches json.dump(indent=2) / compact separators"""
+        for screen in self.screens:
+            pretty = json.dumps(screen, indent=2, ensure_ascii=False).encode('utf-8')
+            compact = json.dumps(screen, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            for backend in ('auto', 'json'):
+                self.assertEqual(JsonSerializer(backend=backend).dumps(screen), pretty)
+                self.assertEqual(JsonSerializer(compact=True, backend=backend).dumps(screen), compact)
+
+    def test_falls_back_without_orjson(self):
+        """'auto' picks the stdlib encoder when orjson is not installed"""
+        with mock.patch.object(excel_to_json_converter, 'orjson', None):
+            self.assertEqual(JsonSerializer().backend, 'json')
+            with self.assertRaises(ValueError):
+                JsonSerializer(backend='orjson')
+
+    def test_numeric_sections_never_become_nan(self):
+        """Numeric Section cells (as read from .xlsx) are text, and no backend writes NaN"""
+        converter = ExcelToJsonConverter('unused.csv', self.output_root)
+        df = sample_screens_frame().astype(object)
+        df['section'] = [5, 2.5, None, 'Funds & Financing', None, None]
+        sections = {sid: screen['section'] for sid, screen in converter._build_screens(df)}
+        self.assertEqual(sections, {'screen_b': '5', 'screen_a': '2.5', 'screen_c': 'funds_and_financing',
+                                    'screen_d': ''})
+        self.assertEqual(converter._format_section_name(5), '5')
+        data = {'section': float('nan'), 'options': [1.5, float('inf')]}
+        for backend in ('json', 'orjson'):
+            with self.subTest(backend=backend):
+                self.assertEqual(json.loads(JsonSerializer(backend=backend).dumps(data)),
+                                 {'section': None, 'options': [1.5, None]})
+
+
+class TestStreamingConversion(SampleCsvTestCase):
+    def sample_source_frame(self):
+        df = pd.concat([sample_screens_frame()] * 3, ignore_index=True)
+        # Screen ids that span chunk boundaries
+        df['screen_template_id'] = ['s1', 's1', 's1', 's2', 's2', 's3',
+                                    's3', 's4', 's4', 's5', 's5', 's5',
+                                    's6', 's6', 's6', 's6', 's7', 's7']
+        return df
+
+    def convert(self, chunksize):
+        converter = self.make_converter(os.path.join(self.root, str(chunksize)), chunksize=chunksize)
+        converter.convert()
+        return read_output_dir(converter.output_dir)
+
+    def test_chunked_output_matches_full_read(self):
+        """Streaming in small chunks gives the same screens as reading the whole file"""
+        expected = self.convert(None)
+        self.assertEqual(len(expected), 7)
+        for chunksize in (1, 2, 5, 100):
+            self.assertEqual(self.convert(chunksize), expected)
+
+    def test_multi_row_screens_merge_components(self):
+        """Every row of a screen contributes its component, also across chunks"""
+        screens = self.convert(2)
+        self.assertEqual(list(screens['s1.json']['components']), ['loan_type', 'zip_code', 'other'])
+        self.assertEqual(list(screens['s6.json']['components']), ['loan_type', 'zip_code', 'other', 'amount'])
+
+    def test_reappearing_rows_are_dropped_with_warning(self):
+        """Streaming needs the rows of a screen together: rows after it was written are dropped and counted"""
+        df = pd.concat([sample_screens_frame()] * 3, ignore_index=True)
+        df['screen_template_id'] = ['s1', 's1', 's1', 's2', 's2', 's3',
+                                    's3', 's4', 's4', 's1', 's5', 's5',
+                                    's6', 's6', 's6', 's6', 's7', 's7']
+        self.write_csv(df)
+        full = self.convert(None)
+        self.assertEqual(list(full['s1.json']['components']), ['loan_type', 'zip_code', 'other', 'amount'])
+        with self.assertLogs('excel_to_json_converter', 'WARNING') as logs:
+            streamed = self.convert(2)
+        self.assertIn('Ignored 1 rows of screens already written', '\n'.join(logs.output))
+        self.assertEqual(list(streamed['s1.json']['components']), ['loan_type', 'zip_code', 'other'])
+        self.assertEqual({k: v for k, v in streamed.items() if k != 's1.json'},
+                         {k: v for k, v in full.items() if k != 's1.json'})
+
+
+class TestPrunedCsvRead(SampleCsvTestCase):
+    def sample_source_frame(self):
+        df = sample_screens_frame()
+        df['default_value'] = ['0042', '1', None, 'TRUE', '3.50', None]
+        df['Arturo To Do'] = 'check'
+        df['Notes'] = 1.5
+        return df
+
+    def test_only_mapped_columns_read_as_strings(self):
+        """Ignored columns are not parsed and cells keep their literal text"""
+        converter = self.make_converter(self.root, csv_engine='c')
+        converter.read_file()
+        self.assertNotIn('Arturo To Do', converter.df.columns)
+        self.assertNotIn('Notes', converter.df.columns)
+        self.assertEqual(set(converter.df.columns), set(sample_screens_frame().columns))
+        self.assertEqual(converter.df['default_value'].dropna().tolist(), ['0042', '1', 'TRUE', '3.50'])
+
+    def test_streamed_read_is_pruned_too(self):
+        """Chunked reads use the same column pruning"""
+        converter = self.make_converter(self.root, chunksize=2)
+        chunk = next(converter._iter_chunks())
+        self.assertEqual(set(chunk.columns), set(sample_screens_frame().columns))
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow is not installed")
+    def test_pyarrow_read_matches_c_parser(self):
+        """pyarrow skips the comment line, prunes columns and keeps cells as text like the c parser"""
+        frames = {}
+        for engine in ('c', 'pyarrow'):
+            converter = self.make_converter(self.root, csv_engine=engine)
+            converter.read_file()
+            frames[engine] = converter.df
+        pd.testing.assert_frame_equal(frames['pyarrow'], frames['c'])
+
+        # Above the stdlib size limit, 'auto' picks pyarrow for whole-file conversions
+        outputs = {}
+        with mock.patch.object(excel_to_json_converter, 'STDLIB_CSV_MAX_BYTES', 10):
+            for engine in ('c', 'auto'):
+                converter = self.make_converter(os.path.join(self.root, engine), csv_engine=engine)
+                self.assertEqual(converter._csv_read_options()['engine'], 'pyarrow' if engine == 'auto' else 'c')
+                converter.convert()
+                outputs[engine] = read_output_dir(converter.output_dir)
+        self.assertEqual(outputs['auto'], outputs['c'])
+
+
+class TestExcelIngestion(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.xlsx_file = os.path.join(self.root, 'screens.xlsx')
+        self.cache_dir = os.path.join(self.root, 'cache')
+        converter = ExcelToJsonConverter(self.xlsx_file, self.root)
+        df = sample_screens_frame()
+        df['default_value'] = [7, 'x', None, 'N/A', 2.5, None]
+        df['Notes'] = 'ignored'
+        # Keep the rows of each screen together so streamed chunks can merge them
+        df = df.iloc[[0, 2, 1, 3, 4, 5]]
+        df.rename(columns={v: k for k, v in converter.column_mapping.items()}).to_excel(self.xlsx_file, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def read(self, **kwargs):
+        converter = ExcelToJsonConverter(self.xlsx_file, self.root, **kwargs)
+        converter.read_file()
+        return converter, converter.df
+
+    def test_streaming_reader_matches_read_excel(self):
+        """Row-by-row read-only ingestion gives the same screens as pd.read_excel"""
+        converter, df = self.read()
+        self.assertNotIn('Notes', df.columns)
+        expected = pd.read_excel(self.xlsx_file).rename(columns=converter.column_mapping)
+        self.assertEqual(
+            [(sid, strip_ids(screen)) for sid, screen in converter._build_screens(df)],
+            [(sid, strip_ids(screen)) for sid, screen in converter._build_screens(expected)])
+
+    def test_chunked_excel_matches_whole_read(self):
+        """Streaming an .xlsx in chunks groups screens like a whole read"""
+        converter, df = self.read()
+        chunked = ExcelToJsonConverter(self.xlsx_file, self.root, chunksize=2)
+        screens = [(sid, strip_ids(screen)) for frame in chunked._iter_screen_frames()
+                   for sid, screen in chunked._build_screens(frame)]
+        self.assertEqual(sorted(screens), sorted((sid, strip_ids(screen)) for sid, screen in converter._build_screens(df)))
+
+    def test_frame_cache_skips_excel_parsing(self):
+        """An unchanged workbook is served from the cache; a modified one is parsed again"""
+        _, first = self.read(cache_dir=self.cache_dir)
+        with mock.patch('openpyxl.load_workbook', side_effect=AssertionError('parsed again')):
+            _, cached = self.read(cache_dir=self.cache_dir)
+        pd.testing.assert_frame_equal(cached, first)
+
+        stat = os.stat(self.xlsx_file)
+        os.utime(self.xlsx_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        with mock.patch('openpyxl.load_workbook', side_effect=AssertionError('parsed again')):
+            with self.assertRaises(AssertionError):
+                self.read(cache_dir=self.cache_dir)
+        self.read(cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+
+class TestRowSelection(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.csv_file = os.path.join(self.root, 'screens.csv')
+        df = pd.concat([sample_screens_frame()] * 4, ignore_index=True)
+        df['screen_template_id'] = [f's{i}' for i in range(len(df))]
+        df.loc[3, 'description'] = 'multi\nline'
+        write_source_csv(self.csv_file, df, ExcelToJsonConverter(self.csv_file, self.root))
+        self.full = pd.read_csv(self.csv_file, skiprows=1, dtype=str)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def read(self, **selection):
+        converter = ExcelToJsonConverter(self.csv_file, self.root, **selection)
+        converter.read_file()
+        return converter.df['screen_template_id'].tolist()
+
+    def expected(self, rows):
+        return [sid for sid in rows['Screen_ID'].tolist() if isinstance(sid, str)]
+
+    def test_selection_matches_full_read(self):
+        """Pushed-down selections select the same rows as iloc/isin on a full read"""
+        self.assertEqual(self.read(row_selection_mode='range', row_range=(2, 9)),
+                         self.expected(self.full.iloc[2:10]))
+        self.assertEqual(self.read(row_selection_mode='indices', row_indices=[9, 3, 17, 3]),
+                         self.expected(self.full.iloc[[9, 3, 17, 3]]))
+        self.assertEqual(self.read(row_selection_mode='indices', row_indices=[-1, 0]),
+                         self.expected(self.full.iloc[[-1, 0]]))
+        self.assertEqual(self.read(row_selection_mode='ids', row_ids=['s20', 's4', 'nope']), ['s4', 's20'])
+        self.assertEqual(self.read(row_selection_mode='all'), self.expected(self.full))
+        with self.assertRaises(IndexError):
+            self.read(row_selection_mode='indices', row_indices=[2, 500])
+
+    def test_unselected_rows_are_not_parsed(self):
+        """A malformed row outside the range does not break the read"""
+        with open(self.csv_file, 'a') as f:
+            f.write('"broken\n')
+        with self.assertRaises(Exception):
+            self.read(row_selection_mode='all')
+        self.assertEqual(self.read(row_selection_mode='range', row_range=(0, 1)), ['s0', 's1'])
+        self.assertEqual(self.read(row_selection_mode='indices', row_indices=[4]), ['s4'])
+
+    def test_selection_is_per_instance(self):
+        """Converters with different selections do not share global state"""
+        first = ExcelToJsonConverter(self.csv_file, self.root, row_selection_mode='ids', row_ids=['s1'])
+        second = ExcelToJsonConverter(self.csv_file, self.root, row_selection_mode='range', row_range=(0, 0))
+        first.read_file()
+        second.read_file()
+        self.assertEqual(first.df['screen_template_id'].tolist(), ['s1'])
+        self.assertEqual(second.df['screen_template_id'].tolist(), ['s0'])
+        self.assertEqual(excel_to_json_converter.ROW_SELECTION_MODE, 'indices')
+
+    def test_streaming_selection(self):
+        """Chunked reads apply the same selections (in file order)"""
+        for selection, expected in (
+            ({'row_selection_mode': 'range', 'row_range': (2, 9)}, self.expected(self.full.iloc[2:10])),
+            ({'row_selection_mode': 'indices', 'row_indices': [9, 3, 17]}, self.expected(self.full.iloc[[3, 9, 17]])),
+            ({'row_selection_mode': 'ids', 'row_ids': ['s20', 's4']}, ['s4', 's20']),
+        ):
+            converter = ExcelToJsonConverter(self.csv_file, self.root, chunksize=3, **selection)
+            ids = [sid for chunk in converter._iter_chunks() for sid in chunk['screen_template_id']]
+            self.assertEqual(ids, expected)
+
+    def test_out_of_range_indices_raise_on_every_path(self):
+        """Whole-file and chunked reads, with or without pushdown, reject indices past the end alike"""
+        selection = {'row_selection_mode': 'indices', 'row_indices': [2, 500]}
+        for blank_lines in (False, True):
+            if blank_lines:
+                with open(self.csv_file, 'a', encoding='utf-8') as f:
+                    f.write('\n')
+            whole = ExcelToJsonConverter(self.csv_file, self.root, **selection)
+            self.assertEqual(whole._pushdown_selection() is None, blank_lines)
+            with self.assertRaisesRegex(IndexError, r'out of range: \[500\]'):
+                whole.read_file()
+            chunked = ExcelToJsonConverter(self.csv_file, self.root, chunksize=3, **selection)
+            with self.assertRaisesRegex(IndexError, r'out of range: \[500\]'):
+                list(chunked._iter_chunks())
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow is not installed")
+    def test_pyarrow_engine_selects_after_reading(self):
+        """pyarrow has no nrows or chunks: it reads the whole sheet and selects like a full read"""
+        self.assertEqual(self.read(csv_engine='pyarrow', row_selection_mode='indices', row_indices=[9, 3, 17, 3]),
+                         self.expected(self.full.iloc[[9, 3, 17, 3]]))
+        self.assertEqual(self.read(csv_engine='pyarrow', row_selection_mode='ids', row_ids=['s20', 's4', 'nope']),
+                         ['s4', 's20'])
+        with self.assertRaises(IndexError):
+            self.read(csv_engine='pyarrow', row_selection_mode='indices', row_indices=[2, 500])
+
+    def test_pyarrow_engine_refuses_chunks(self):
+        with self.assertRaises(ValueError):
+            ExcelToJsonConverter(self.csv_file, self.root, csv_engine='pyarrow', chunksize=100)
+
+    def test_blank_lines_do_not_shift_positions(self):
+        """Blank lines are not rows: every reader selects the rows iloc selects on a full read"""
+        with open(self.csv_file, encoding='utf-8') as f:
+            lines = f.readlines()
+        lines[3:3] = ['\n', '  \n']
+        with open(self.csv_file, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        full = pd.read_csv(self.csv_file, skiprows=1, dtype=str)
+        for selection, rows in (
+            ({'row_selection_mode': 'range', 'row_range': (2, 3)}, full.iloc[2:4]),
+            ({'row_selection_mode': 'indices', 'row_indices': [9, 2]}, full.iloc[[9, 2]]),
+        ):
+            expected = self.expected(rows)
+            self.assertEqual(expected[0], 's2' if selection['row_selection_mode'] == 'range' else 's9')
+            self.assertEqual(self.read(csv_engine='c', **selection), expected)
+            converter = ExcelToJsonConverter(self.csv_file, self.root, **selection)
+            self.assertEqual([row['screen_template_id'] for row in converter.read_records()], expected)
+            converter = ExcelToJsonConverter(self.csv_file, self.root, chunksize=3, **selection)
+            ids = [sid for chunk in converter._iter_chunks() for sid in chunk['screen_template_id']]
+            self.assertEqual(ids, sorted(expected, key=lambda sid: int(sid[1:])))
+
+
+class TestStdlibCsvReader(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.csv_file = os.path.join(self.root, 'screens.csv')
+        df = pd.concat([sample_screens_frame()] * 3, ignore_index=True)
+        df.loc[7, 'title'] = 'NA'
+        write_source_csv(self.csv_file, df, ExcelToJsonConverter(self.csv_file, self.root))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def convert(self, csv_engine, **selection):
+        converter = ExcelToJsonConverter(self.csv_file, os.path.join(self.root, csv_engine),
+                                         csv_engine=csv_engine, deterministic_ids=True, **selection)
+        converter.convert()
+        output = {}
+        for filename in sorted(os.listdir(converter.output_dir)):
+            with open(os.path.join(converter.output_dir, filename), 'rb') as f:
+                output[filename] = f.read()
+        shutil.rmtree(converter.output_dir)
+        return output
+
+    def test_identical_json_to_pandas(self):
+        """The stdlib reader and builder write byte-identical screens for every row selection"""
+        for selection in ({'row_selection_mode': 'all'},
+                          {'row_selection_mode': 'range', 'row_range': (2, 9)},
+                          {'row_selection_mode': 'indices', 'row_indices': [9, 0, 3, 3]},
+                          {'row_selection_mode': 'ids', 'row_ids': ['screen_b', 'screen_d']}):
+            with self.subTest(**selection):
+                expected = self.convert('c', **selection)
+                self.assertTrue(expected)
+                self.assertEqual(self.convert('stdlib', **selection), expected)
+
+    def test_auto_selects_by_size(self):
+        """Small whole-file conversions use the stdlib reader; incremental ones stay on pandas"""
+        converter = ExcelToJsonConverter(self.csv_file, self.root)
+        self.assertTrue(converter._use_stdlib_reader())
+        with mock.patch.object(excel_to_json_converter, 'STDLIB_CSV_MAX_BYTES', 10):
+            self.assertFalse(converter._use_stdlib_reader())
+        self.assertFalse(ExcelToJsonConverter(self.csv_file, self.root, incremental=True)._use_stdlib_reader())
+
+    def test_small_conversion_does_not_import_pandas(self):
+        """Converting a small CSV and importing validate_json leave pandas unimported"""
+        script = (
+            "import sys, excel_to_json_converter, validate_json\n"
+            "excel_to_json_converter.ExcelToJsonConverter(sys.argv[1], sys.argv[2],"
+            " row_selection_mode='all').convert()\n"
+            "print('pandas' in sys.modules)\n"
+        )
+        output = subprocess.run([sys.executable, '-c', script, self.csv_file, os.path.join(self.root, 'json')],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(excel_to_json_converter.__file__))).stdout
+        self.assertEqual(output.strip(), 'False')
+
+
+class TestIterScreens(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.csv_file = os.path.join(self.root, 'screens.csv')
+        self.df = sample_screens_frame()
+        write_source_csv(self.csv_file, self.df, ExcelToJsonConverter(self.csv_file, self.root))
+        self.options = {'row_selection_mode': 'all', 'deterministic_ids': True, 'output_dir': self.root}
+        self.expected = {}
+        for path in ExcelToJsonConverter(self.csv_file, **self.options).convert()['written']:
+            with open(path, encoding='utf-8') as f:
+                self.expected[os.path.basename(path)[:-len('.json')]] = json.load(f)
+        self.listing = sorted(os.listdir(self.root))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def assertScreens(self, screens):
+        self.assertEqual(dict(screens), self.expected)
+        # Nothing was created on disk
+        self.assertEqual(sorted(os.listdir(self.root)), self.listing)
+
+    def test_sources_yield_converted_screens(self):
+        """Paths, text/binary file objects and DataFrames yield the screens convert() writes"""
+        self.assertScreens(excel_to_json_converter.iter_screens(self.csv_file, **self.options))
+        with open(self.csv_file, encoding='utf-8', newline='') as f:
+            self.assertScreens(excel_to_json_converter.iter_screens(f, **self.options))
+        with open(self.csv_file, 'rb') as f:
+            self.assertScreens(excel_to_json_converter.iter_screens(f, **self.options))
+            self.assertFalse(f.closed)
+        self.assertScreens(excel_to_json_converter.iter_screens(self.df, **self.options))
+        source = self.df.rename(columns={v: k for k, v in ExcelToJsonConverter('unused.csv').column_mapping.items()})
+        self.assertScreens(excel_to_json_converter.iter_screens(source, **self.options))
+
+    def test_screens_are_lazy(self):
+        """Nothing is read before the first screen is requested"""
+        with mock.patch.object(ExcelToJsonConverter, 'read_records') as read_records:
+            screens = excel_to_json_converter.iter_screens(self.csv_file, **self.options)
+            read_records.assert_not_called()
+            self.assertEqual(list(screens), [])
+            read_records.assert_called_once()
+
+    def test_file_object_is_streamed_with_chunksize(self):
+        """With chunksize a file object is parsed chunk by chunk, not read whole"""
+        class CountingReader(io.BytesIO):
+            bytes_read = 0
+
+            def read(self, size=-1):
+                data = super().read(size)
+                self.bytes_read += len(data)
+                return data
+
+        df = pd.concat([self.df.iloc[[1, 3]]] * 3000, ignore_index=True)
+        df['screen_template_id'] = [f's{i // 2}' for i in range(len(df))]
+        big_csv = os.path.join(tempfile.mkdtemp(dir=self.root), 'big.csv')
+        write_source_csv(big_csv, df, ExcelToJsonConverter(big_csv))
+        with open(big_csv, 'rb') as f:
+            source = CountingReader(f.read())
+        options = dict(self.options, chunksize=500)
+        screens = excel_to_json_converter.iter_screens(source, **options)
+        first_id, first = next(screens)
+        self.assertEqual(first_id, 's0')
+        self.assertLess(source.bytes_read, len(source.getvalue()) // 4)
+        streamed = dict(screens, s0=first)
+        self.assertEqual(streamed, dict(excel_to_json_converter.iter_screens(big_csv, **options)))
+        self.assertEqual(len(streamed), 3000)
+
+
+class TestScreenWriter(SampleCsvTestCase):
+    def sample_source_frame(self):
+        df = sample_screens_frame()
+        df.loc[0, 'screen_template_id'] = 'no_such_dir/screen_b'
+        return df
+
+    def test_failures_do_not_abort_batch(self):
+        """A screen that cannot be written is reported and the others are still written"""
+        converter = self.make_converter(os.path.join(self.root, 'json'), writer_workers=2)
+        result = converter.convert()
+        self.assertEqual(list(result['failed']), ['no_such_dir/screen_b'])
+        self.assertEqual(sorted(os.listdir(converter.output_dir)),
+                         ['screen_a.json', 'screen_b.json', 'screen_c.json', 'screen_d.json'])
+        self.assertEqual(len(result['written']), 4)
+
+    def test_files_get_umask_permissions(self):
+        """Screen files get the mode open() gives, not mkstemp's owner-only 0600"""
+        converter = self.make_converter(os.path.join(self.root, 'json'))
+        result = converter.convert()
+        reference = os.path.join(self.root, 'reference.json')
+        open(reference, 'w').close()
+        expected = os.stat(reference).st_mode & 0o777
+        self.assertEqual({os.stat(path).st_mode & 0o777 for path in result['written']}, {expected})
+
+
+class TestIncrementalConversion(SampleCsvTestCase):
+    def setUp(self):
+        super().setUp()
+        self.output_root = os.path.join(self.root, 'json')
+
+    def convert(self):
+        converter = self.make_converter(self.output_root, incremental=True)
+        return converter.output_dir, converter.convert()
+
+    def test_only_changed_screens_are_rebuilt(self):
+        """Second run skips unchanged screens and reports added, changed and removed ones"""
+        output_dir, first = self.convert()
+        self.assertEqual(output_dir, os.path.join(self.output_root, 'screens'))
+        self.assertEqual(first['added'], ['screen_b', 'screen_a', 'screen_c', 'screen_d'])
+        with open(os.path.join(output_dir, 'screen_a.json')) as f:
+            screen_a = f.read()
+
+        _, second = self.convert()
+        self.assertEqual(second['written'], [])
+        self.assertEqual(len(second['unchanged']), 4)
+
+        df = sample_screens_frame()
+        df.loc[2, 'title'] = 'edited'  # second row of screen_b
+        df.loc[3, 'screen_template_id'] = 'screen_e'  # screen_c becomes screen_e
+        self.write_csv(df)
+        _, third = self.convert()
+        self.assertEqual(third['added'], ['screen_e'])
+        self.assertEqual(third['changed'], ['screen_b'])
+        self.assertEqual(third['removed'], ['screen_c'])
+        self.assertEqual(sorted(os.listdir(output_dir)),
+                         ['_manifest.json', 'screen_a.json', 'screen_b.json', 'screen_d.json', 'screen_e.json'])
+        with open(os.path.join(output_dir, 'screen_a.json')) as f:
+            self.assertEqual(f.read(), screen_a)
+
+    def test_mapping_change_rebuilds_everything(self):
+        """Changing the mapping config invalidates the manifest"""
+        self.convert()
+        converter = self.make_converter(self.output_root, incremental=True)
+        converter.component_type_mapping['Choice'] = 'select_single_dropdown'
+        result = converter.convert()
+        self.assertEqual(len(result['changed']), 4)
+        self.assertEqual(len(result['written']), 4)
+
+
+class TestInPipelineValidation(SampleCsvTestCase):
+    def setUp(self):
+        super().setUp()
+        self.schema_file = os.path.join(self.root, 'screen_schema.json')
+        schema = {
+            "type": "object",
+            "required": ["screen_template_id", "components"],
+            "properties": {"components": {"additionalProperties": {
+                "properties": {"component_type": {"enum": ["input_text_line", "select_single_cards"]}}
+            }}}
+        }
+        with open(self.schema_file, 'w') as f:
+            json.dump(schema, f)
+
+    def test_invalid_screens_go_to_rejects(self):
+        """Screens failing the schema are reported instead of written"""
+        converter = self.make_converter(os.path.join(self.root, 'json'))
+        result = converter.convert(validate=True, schema_file=self.schema_file)
+        self.assertEqual(list(result['rejected']), ['screen_c'])
+        self.assertEqual(sorted(os.listdir(converter.output_dir)),
+                         ['_rejects.json', 'screen_a.json', 'screen_b.json', 'screen_d.json'])
+        with open(os.path.join(converter.output_dir, '_rejects.json')) as f:
+            rejects = json.load(f)
+        self.assertEqual(rejects[0]['screen_template_id'], 'screen_c')
+        self.assertIn('select_single_dropdown', rejects[0]['error'])
+
+    def test_rejected_screen_drops_earlier_file(self):
+        """An incremental run removes the previous file and index entry of a screen it now rejects"""
+        options = {'incremental': True, 'layout': 'sharded'}
+        self.make_converter(self.root, **options).convert()
+        df = sample_screens_frame()
+        df.loc[3, 'title'] = 'Changed'
+        self.write_csv(df)
+        converter = self.make_converter(self.root, **options)
+        stale = os.path.join(converter.output_dir, excel_to_json_converter.screen_relpath('screen_c', True))
+        self.assertTrue(os.path.exists(stale))
+        result = converter.convert(validate=True, schema_file=self.schema_file)
+        self.assertEqual(result['changed'], ['screen_c'])
+        self.assertEqual(list(result['rejected']), ['screen_c'])
+        self.assertFalse(os.path.exists(stale))
+        with open(os.path.join(converter.output_dir, excel_to_json_converter.INDEX_FILE)) as f:
+            self.assertEqual(sorted(json.load(f)['screens']), ['screen_a', 'screen_b', 'screen_d'])
+
+
+class TestBundleOutput(SampleCsvTestCase):
+    def test_bundle_matches_files_and_supports_lookup(self):
+        """The JSON Lines bundle holds the same screens, fetched one at a time through the index"""
+        files = self.make_converter(os.path.join(self.root, 'files'))
+        files.convert()
+        expected = read_output_dir(files.output_dir)
+
+        converter = self.make_converter(os.path.join(self.root, 'jsonl'), output_format='jsonl')
+        converter.convert()
+        self.assertEqual(sorted(os.listdir(converter.output_dir)), ['screens.jsonl', 'screens.jsonl.idx'])
+        with ScreenBundle(os.path.join(converter.output_dir, 'screens.jsonl')) as bundle:
+            self.assertEqual(len(bundle), 4)
+            self.assertIn('screen_c', bundle)
+            self.assertIsNone(bundle.get('missing'))
+            self.assertEqual({f"{sid}.json": strip_ids(bundle[sid]) for sid in bundle}, expected)
+            self.assertEqual(json.loads(bundle.get_bytes('screen_a'))['title'], 'Zip')
+
+    def test_bundle_rejects_incremental(self):
+        """A bundle is rewritten whole, so incremental mode is refused"""
+        with self.assertRaises(ValueError):
+            self.make_converter(self.root, incremental=True, output_format='jsonl')
+
+
+class TestConversionMetrics(SampleCsvTestCase):
+    def test_metrics_report_counts_and_stages(self):
+        """convert() reports stage timers and counts matching what was written"""
+        converter = self.make_converter(self.root)
+        result = converter.convert(metrics_file=excel_to_json_converter.METRICS_FILE,
+                                   profile_file=excel_to_json_converter.PROFILE_FILE)
+        screens = {}
+        for filename in os.listdir(converter.output_dir):
+            if not filename.startswith('_'):
+                with open(os.path.join(converter.output_dir, filename), encoding='utf-8') as f:
+                    screens[filename] = json.load(f)
+        sizes = sum(os.path.getsize(path) for path in result['written'])
+
+        with open(os.path.join(converter.output_dir, excel_to_json_converter.METRICS_FILE)) as f:
+            report = json.load(f)
+        self.assertEqual(report['input_file'], self.csv_file)
+        self.assertEqual(report['counts']['rows'], sample_screens_frame()['screen_template_id'].count())
+        self.assertEqual(report['counts']['screens'], len(screens))
+        self.assertEqual(report['counts']['written'], len(screens))
+        self.assertEqual(report['counts']['components'],
+                         sum(len(screen['components']) for screen in screens.values()))
+        self.assertEqual(report['counts']['bytes'], sizes)
+        self.assertTrue({'read', 'build', 'submit', 'serialize', 'write', 'close'} <= set(report['stages']))
+        self.assertEqual(report['latency']['build']['count'], len(screens))
+        self.assertEqual(sum(report['latency']['write']['buckets'].values()), len(screens))
+        self.assertEqual(result['metrics']['counts'], report['counts'])
+        self.assertTrue(os.path.exists(os.path.join(converter.output_dir, excel_to_json_converter.PROFILE_FILE)))
+
+    def test_per_file_lines_are_debug_only(self):
+        """Written files are logged at DEBUG; INFO gets the progress summary instead"""
+        converter = self.make_converter(self.root)
+        with self.assertLogs(level='DEBUG') as logs:
+            result = converter.convert()
+        created = [r for r in logs.records if r.getMessage().startswith('Created JSON file')]
+        self.assertEqual(len(created), len(result['written']))
+        self.assertEqual({r.levelname for r in created}, {'DEBUG'})
+        finished = [r.getMessage() for r in logs.records if r.name == 'metrics']
+        self.assertEqual(len(finished), 1)
+        self.assertRegex(finished[0], rf"^screens\.csv: {result['metrics']['counts']['rows']} rows in \d+s \([\d,]+ rows/s\)$")
+
+
+class TestShardedLayout(SampleCsvTestCase):
+    def load_index(self, output_dir):
+        with open(os.path.join(output_dir, excel_to_json_converter.INDEX_FILE), encoding='utf-8') as f:
+            return json.load(f)['screens']
+
+    def test_sharded_files_match_flat_and_index(self):
+        """Sharded screens equal the flat ones and the index gives their path, size and hash"""
+        flat = self.make_converter(os.path.join(self.root, 'flat'))
+        flat.convert()
+        expected = read_output_dir(flat.output_dir)
+
+        converter = self.make_converter(os.path.join(self.root, 'sharded'), layout='sharded')
+        converter.convert()
+        index = self.load_index(converter.output_dir)
+        self.assertEqual(sorted(index), ['screen_a', 'screen_b', 'screen_c', 'screen_d'])
+        actual = {}
+        for screen_id, entry in index.items():
+            shard, filename = entry['path'].split('/')
+            self.assertEqual(len(shard), excel_to_json_converter.SHARD_PREFIX_LENGTH)
+            with open(os.path.join(converter.output_dir, shard, filename), 'rb') as f:
+                data = f.read()
+            self.assertEqual(entry['size'], len(data))
+            self.assertEqual(entry['sha256'], hashlib.sha256(data).hexdigest())
+            actual[filename] = strip_ids(json.loads(data))
+        self.assertEqual(actual, expected)
+
+        # validate_json lists the run from the index
+        listed = [os.path.relpath(path, converter.output_dir) for path in iter_json_files(converter.output_dir)]
+        self.assertEqual(listed, sorted(os.path.normpath(entry['path']) for entry in index.values()))
+
+    def test_incremental_run_updates_index(self):
+        """Incremental sharded runs keep unchanged entries and drop removed screens"""
+        options = {'incremental': True, 'layout': 'sharded'}
+        self.make_converter(self.root, **options).convert()
+        df = sample_screens_frame()
+        df = df[df['screen_template_id'] != 'screen_d']
+        df.loc[1, 'title'] = 'Changed'
+        self.write_csv(df)
+        converter = self.make_converter(self.root, **options)
+        before = self.load_index(converter.output_dir)
+        result = converter.convert()
+        index = self.load_index(converter.output_dir)
+        self.assertEqual(result['removed'], ['screen_d'])
+        self.assertEqual(sorted(index), ['screen_a', 'screen_b', 'screen_c'])
+        self.assertNotEqual(index['screen_a']['sha256'], before['screen_a']['sha256'])
+        self.assertEqual(index['screen_c'], before['screen_c'])
+        self.assertFalse(os.path.exists(os.path.join(converter.output_dir, before['screen_d']['path'])))
+
+    def test_layout_change_removes_previous_files(self):
+        """Switching the layout of an incremental folder deletes the files and index of the old layout"""
+        screens = ['screen_a', 'screen_b', 'screen_c', 'screen_d']
+        flat_files = [f'{sid}.json' for sid in screens]
+        output_dir = self.make_converter(self.root, incremental=True).output_dir
+        for layout in ('flat', 'sharded', 'flat'):
+            result = self.make_converter(self.root, incremental=True, layout=layout).convert()
+            listing = sorted(os.listdir(output_dir))
+            if layout == 'flat':
+                self.assertEqual(listing, ['_manifest.json'] + flat_files)
+            else:
+                self.assertEqual(len(result['changed']), 4)
+                self.assertEqual(sorted(self.load_index(output_dir)), screens)
+                self.assertFalse(set(flat_files) & set(listing))
+            self.assertEqual(len(list(iter_json_files(output_dir))), 4)
+
+
+class TestCompressedOutput(SampleCsvTestCase):
+    def test_gzip_files_read_back_transparently(self):
+        """Compressed screen files hold the same JSON and validate_json reads them as is"""
+        plain = self.make_converter(os.path.join(self.root, 'plain'))
+        plain.convert()
+        expected = {f"{name}.gz": screen for name, screen in read_output_dir(plain.output_dir).items()}
+
+        converter = self.make_converter(os.path.join(self.root, 'gzip'), compression='gzip')
+        result = converter.convert()
+        actual = {}
+        for path in iter_json_files(converter.output_dir):
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(2), b'\x1f\x8b')
+            actual[os.path.basename(path)] = strip_ids(validate_json.load_json_file(path))
+        self.assertEqual(actual, expected)
+        self.assertEqual(result['metrics']['counts']['bytes'],
+                         sum(os.path.getsize(path) for path in result['written']))
+
+    def test_compressed_bundle_random_access(self):
+        """Each line of a gzip bundle is its own member: lookups work and the file gunzips to the plain bundle"""
+        options = {'output_format': 'jsonl', 'deterministic_ids': True}
+        plain = self.make_converter(os.path.join(self.root, 'plain'), **options)
+        plain.convert()
+        converter = self.make_converter(os.path.join(self.root, 'gzip'), compression='gzip',
+                                         **options)
+        converter.convert()
+        self.assertEqual(sorted(os.listdir(converter.output_dir)), ['screens.jsonl.gz', 'screens.jsonl.gz.idx'])
+        bundle_file = os.path.join(converter.output_dir, 'screens.jsonl.gz')
+        with ScreenBundle(os.path.join(plain.output_dir, 'screens.jsonl')) as expected, \
+                ScreenBundle(bundle_file) as bundle:
+            self.assertEqual(list(bundle), list(expected))
+            self.assertEqual(bundle['screen_c'], expected['screen_c'])
+            self.assertEqual(dict(bundle.items()), dict(expected.items()))
+        with open(bundle_file, 'rb') as f, open(os.path.join(plain.output_dir, 'screens.jsonl'), 'rb') as g:
+            self.assertEqual(gzip.decompress(f.read()), g.read())
+
+    def test_compression_change_removes_previous_files(self):
+        """Switching the compression of an incremental folder deletes the files with the old suffix"""
+        output_dir = self.make_converter(self.root, incremental=True).output_dir
+        for compression in ('none', 'gzip', 'none'):
+            self.make_converter(self.root, incremental=True, compression=compression).convert()
+            suffix = compressed.SUFFIXES[compression]
+            self.assertEqual(sorted(os.listdir(output_dir)),
+                             ['_manifest.json'] + [f'screen_{c}.json{suffix}' for c in 'abcd'])
+        options = {'incremental': True, 'layout': 'sharded'}
+        self.make_converter(self.root, compression='gzip', **options).convert()
+        self.make_converter(self.root, **options).convert()
+        files = sorted(os.path.basename(path) for path in iter_json_files(output_dir))
+        self.assertEqual(files, [f'screen_{c}.json' for c in 'abcd'])
+        for dirpath, _, filenames in os.walk(output_dir):
+            self.assertFalse([name for name in filenames if name.endswith('.gz')])
+
+    def test_unavailable_compression_is_refused(self):
+        """Unknown compressions, and zstd without zstandard, fail before converting"""
+        with self.assertRaises(ValueError):
+            self.make_converter(self.root, compression='lzma')
+        with mock.patch.object(compressed, 'zstandard', None), self.assertRaises(ValueError):
+            self.make_converter(self.root, compression='zstd')
+
+
+class TestParallelMain(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.root, 'csv-to-convert')
+        os.makedirs(self.input_dir)
+        converter = ExcelToJsonConverter('unused.csv', os.path.join(self.root, 'unused'))
+        for i in range(3):
+            df = sample_screens_frame()
+            df['screen_template_id'] = df['screen_template_id'] + f'_{i}'
+            write_source_csv(os.path.join(self.input_dir, f'sheet_{i}.csv'), df, converter)
+        with open(os.path.join(self.input_dir, 'broken.csv'), 'w') as f:
+            f.write('comment\nScreen_ID,Title\nonly,columns\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def run_main(self, workers):
+        output_dir = os.path.join(self.root, f'json_{workers}')
+        exit_code = excel_to_json_converter.main(
+            ['--input-dir', self.input_dir, '--output-dir', output_dir, '--workers', str(workers), '--rows', 'all'])
+        screens = {}
+        for run_dir in os.listdir(output_dir):
+            screens.update(read_output_dir(os.path.join(output_dir, run_dir)))
+        return exit_code, screens
+
+    def test_process_pool_matches_sequential(self):
+        """Parallel conversion writes the same screens and reports the failing file"""
+        sequential = self.run_main(1)
+        parallel = self.run_main(3)
+        self.assertEqual(sequential[0], 1)
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(len(parallel[1]), 12)
+
+
+class TestWatchMode(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.root, 'csv-to-convert')
+        self.output_dir = os.path.join(self.root, 'json')
+        os.makedirs(self.input_dir)
+        self.csv_file = os.path.join(self.input_dir, 'screens.csv')
+        self.converter = ExcelToJsonConverter(self.csv_file, os.path.join(self.root, 'unused'))
+        self.options = {'incremental': True, 'row_selection_mode': 'all'}
+        self.mtime = 10 ** 18
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def save(self, title):
+        """Save the sheet with a new Title on screen_a and a new mtime, like an editor would"""
+        df = sample_screens_frame()
+        df.loc[1, 'title'] = title
+        write_source_csv(self.csv_file, df, self.converter)
+        self.mtime += 10 ** 9
+        os.utime(self.csv_file, ns=(self.mtime, self.mtime))
+
+    def screen_title(self):
+        with open(os.path.join(self.output_dir, 'screens', 'screen_a.json'), encoding='utf-8') as f:
+            return json.load(f)['title']
+
+    def test_converts_new_and_modified_files_once(self):
+        """Existing, new and modified files are converted once each, after the debounce"""
+        watcher = excel_to_json_converter.InputWatcher(self.input_dir, self.output_dir, self.options, debounce=1.0)
+        self.save('Zip')
+        self.assertEqual(watcher.poll(now=0.0), [])
+        self.assertEqual(watcher.poll(now=0.5), [])
+        self.assertEqual(watcher.poll(now=1.0), ['screens.csv'])
+        self.assertEqual(self.screen_title(), 'Zip')
+        self.assertEqual(watcher.poll(now=5.0), [])
+
+        # A burst of saves is converted once, when the file settles
+        for now, title in ((5.5, 'First'), (6.0, 'Second'), (6.5, 'Final')):
+            self.save(title)
+            self.assertEqual(watcher.poll(now=now), [])
+        self.assertEqual(watcher.poll(now=7.0), [])
+        self.assertEqual(watcher.poll(now=7.5), ['screens.csv'])
+        self.assertEqual(self.screen_title(), 'Final')
+
+        # Editor lock files are ignored
+        with open(os.path.join(self.input_dir, '~$screens.csv'), 'w') as f:
+            f.write('lock')
+        self.assertEqual(watcher.poll(now=100.0), [])
+
+    def test_watch_polls_until_stopped(self):
+        """watch() runs a pass per poll interval until stop is set"""
+        self.save('Zip')
+        stop = mock.Mock(**{'is_set.side_effect': [False, False, True]})
+        excel_to_json_converter.watch(self.input_dir, self.output_dir, self.options, poll_interval=7, debounce=0,
+                                      stop=stop)
+        self.assertEqual(stop.wait.call_args_list, [mock.call(7), mock.call(7)])
+        self.assertEqual(self.screen_title(), 'Zip')
+
+
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    unittest.main() 
@@ -0,0 +1,49 @@
+import unittest
+from unittest import mock
+
+import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_merge_adds_worker_reports(self):
+        """Stage times, calls and counts of another report are added up"""
+        worker = metrics.Metrics()
+        worker.add_time('validate', 0.5)
+        worker.count('files', 3)
+        merged = metrics.Metrics()
+        merged.add_time('validate', 0.25)
+        merged.merge(worker.report())
+        merged.merge(worker.report())
+        report = merged.report()
+        self.assertEqual(report['stages']['validate'], {'seconds': 1.25, 'calls': 3})
+        self.assertEqual(report['counts'], {'files': 6})
+
+
+class TestProgress(unittest.TestCase):
+    def test_lines_are_throttled(self):
+        """At most one progress line per interval, plus the final one"""
+        log = mock.Mock()
+        progress = metrics.Progress('sheet.csv', total=1000, interval=3600, log=log)
+        for _ in range(1000):
+            progress.update()
+        self.assertEqual(log.info.call_count, 0)
+        progress.finish()
+        self.assertEqual(log.info.call_count, 1)
+
+    def test_line_has_rate_and_eta(self):
+        """Known totals give a percentage and an ETA, unknown ones only the rate"""
+        with mock.patch.object(metrics.time, 'perf_counter', return_value=0.0):
+            progress = metrics.Progress('sheet.csv', total=300, log=mock.Mock())
+        progress.done = 100
+        self.assertEqual(progress.line(now=10.0), "sheet.csv: 100/300 rows (33%), 10 rows/s, ETA 20s")
+        progress.total = None
+        self.assertEqual(progress.line(now=10.0), "sheet.csv: 100 rows, 10 rows/s")
+
+    def test_format_duration(self):
+        self.assertEqual(metrics.format_duration(42.4), '42s')
+        self.assertEqual(metrics.format_duration(185), '3m05s')
+        self.assertEqual(metrics.format_duration(7260), '2h01m')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+import jsonschema
+import compressed
+import validate_json
+
+SCREEN_SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "required": ["screen_template_id", "components"],
+    "properties": {
+        "screen_template_id": {"type": "string"},
+        "components": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "required": ["id", "component_type"],
+                "properties": {"id": {"type": "string", "format": "uuid"}}
+            }
+        }
+    }
+}
+
+VALID_SCREEN = {
+    "screen_template_id": "screen_a",
+    "components": {"a": {"id": "79565085-434c-4fa8-8b6e-9705a8b934ce", "component_type": "input_text_line"}}
+}
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+class TestValidateJson(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.json_dir = os.path.join(self.root, 'json')
+        self.schema_file = os.path.join(self.root, 'screen_schema.json')
+        write_json(self.schema_file, SCREEN_SCHEMA)
+        invalid = dict(VALID_SCREEN, components={"a": {"id": "not-a-uuid", "component_type": "x"}})
+        write_json(os.path.join(self.json_dir, '2024-01-01_00-00-00', 'screen_a.json'), VALID_SCREEN)
+        write_json(os.path.join(self.json_dir, '2024-01-02_00-00-00', 'screen_a.json'), VALID_SCREEN)
+        write_json(os.path.join(self.json_dir, '2024-01-02_00-00-00', 'screen_b.json'), invalid)
+        write_json(os.path.join(self.json_dir, '2024-01-02_00-00-00', '_manifest.json'), {"screens": {}})
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_build_validator_checks_schema(self):
+        """An invalid schema is rejected once, up front"""
+        with self.assertRaises(jsonschema.exceptions.SchemaError):
+            validate_json.build_validator({"type": "not-a-type"})
+
+    def test_format_checker_enabled(self):
+        """Format keywords are enforced by the prebuilt validator"""
+        validator = validate_json.build_validator(SCREEN_SCHEMA)
+        files = list(validate_json.iter_json_files(self.json_dir))
+        results = [validate_json.validate_json_file(f, validator)[0] for f in files]
+        self.assertEqual(results, [True, True, False])
+
+    def test_recursive_scan_skips_metadata(self):
+        """Timestamped run folders are scanned and '_' files are skipped"""
+        files = [os.path.relpath(f, self.json_dir) for f in validate_json.iter_json_files(self.json_dir)]
+        self.assertEqual(files, [
+            os.path.join('2024-01-01_00-00-00', 'screen_a.json'),
+            os.path.join('2024-01-02_00-00-00', 'screen_a.json'),
+            os.path.join('2024-01-02_00-00-00', 'screen_b.json'),
+        ])
+        self.assertEqual(validate_json.latest_run(self.json_dir), '2024-01-02_00-00-00')
+
+
+    def test_main_writes_metrics(self):
+        """The metrics report counts every validated file"""
+        metrics_file = os.path.join(self.root, 'metrics.json')
+        validate_json.main(['--schema', self.schema_file, '--json-dir', self.json_dir, '--metrics', metrics_file])
+        with open(metrics_file) as f:
+            report = json.load(f)
+        self.assertEqual(report['counts']['files'], 3)
+        self.assertEqual(report['counts']['valid'], 2)
+        self.assertEqual(report['counts']['invalid'], 1)
+        self.assertEqual(report['latency']['file']['count'], 3)
+        self.assertIn('validate', report['stages'])
+
+    def test_cache_skips_unchanged_files(self):
+        """Unchanged files are reported from the cache; changed files and a new schema are validated again"""
+        metrics_file = os.path.join(self.root, 'metrics.json')
+        argv = ['--schema', self.schema_file, '--json-dir', self.json_dir, '--metrics', metrics_file]
+
+        def run():
+            validate_json.main(argv)
+            with open(metrics_file) as f:
+                return json.load(f)['counts']
+
+        self.assertEqual(run().get('cached', 0), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.json_dir, validate_json.CACHE_FILE)))
+        counts = run()
+        self.assertEqual((counts['cached'], counts['valid'], counts['invalid']), (3, 2, 1))
+
+        write_json(os.path.join(self.json_dir, '2024-01-01_00-00-00', 'screen_a.json'),
+                   dict(VALID_SCREEN, components={"a": {"component_type": "x"}}))
+        counts = run()
+        self.assertEqual((counts['cached'], counts['valid'], counts['invalid']), (2, 1, 2))
+
+        write_json(self.schema_file, dict(SCREEN_SCHEMA, required=["screen_template_id"]))
+        self.assertEqual(run().get('cached', 0), 0)
+
+    def test_parallel_report_and_exit_codes(self):
+        """Worker processes give the same report as one process, with error paths and a CI exit code"""
+        reports = []
+        for workers in ('1', '2'):
+            report_file = os.path.join(self.root, f'report-{workers}.json')
+            code = validate_json.main(['--schema', self.schema_file, '--json-dir', self.json_dir, '--no-cache',
+                                       '--workers', workers, '--chunk-size', '1', '--report', report_file])
+            self.assertEqual(code, validate_json.EXIT_INVALID)
+            with open(report_file) as f:
+                reports.append(json.load(f))
+        self.assertEqual(reports[0], reports[1])
+        self.assertEqual((reports[0]['files'], reports[0]['valid'], reports[0]['invalid']), (3, 2, 1))
+        invalid = reports[0]['invalid_files'][0]
+        self.assertEqual(invalid['file'], os.path.join('2024-01-02_00-00-00', 'screen_b.json'))
+        self.assertEqual(invalid['path'], '$.components.a.id')
+
+        argv = ['--schema', self.schema_file, '--json-dir', self.json_dir]
+        self.assertEqual(validate_json.main(argv + ['--run', '2024-01-01_00-00-00']), validate_json.EXIT_OK)
+        self.assertEqual(validate_json.main(['--schema', os.path.join(self.root, 'missing.json'),
+                                             '--json-dir', self.json_dir]), validate_json.EXIT_ERROR)
+
+    def test_max_errors_stops_early(self):
+        """Fail-fast stops at the Nth invalid file; broken JSON counts as invalid"""
+        with open(os.path.join(self.json_dir, '2024-01-01_00-00-00', 'a_broken.json'), 'w') as f:
+            f.write('{"screen_template_id": ')
+        report_file = os.path.join(self.root, 'report.json')
+        code = validate_json.main(['--schema', self.schema_file, '--json-dir', self.json_dir,
+                                   '--max-errors', '1', '--report', report_file])
+        self.assertEqual(code, validate_json.EXIT_INVALID)
+        with open(report_file) as f:
+            report = json.load(f)
+        self.assertTrue(report['stopped_early'])
+        self.assertEqual((report['files'], report['checked']), (4, 1))
+        self.assertTrue(report['invalid_files'][0]['message'].startswith('Not valid JSON'))
+
+    def test_zstd_file_without_zstandard_is_invalid(self):
+        """A .json.zst file that cannot be decompressed is reported, not fatal"""
+        with open(os.path.join(self.json_dir, '2024-01-01_00-00-00', 'screen_z.json.zst'), 'wb') as f:
+            f.write(b'\x28\xb5\x2f\xfd')
+        report_file = os.path.join(self.root, 'report.json')
+        with mock.patch.object(compressed, 'zstandard', None):
+            code = validate_json.main(['--schema', self.schema_file, '--json-dir', self.json_dir,
+                                       '--no-cache', '--report', report_file])
+        self.assertEqual(code, validate_json.EXIT_INVALID)
+        with open(report_file) as f:
+            report = json.load(f)
+        self.assertEqual((report['files'], report['checked'], report['invalid']), (4, 4, 2))
+        self.assertIn('zstandard', report['invalid_files'][0]['message'])
+
+if __name__ == '__main__':
+    unittest.main()
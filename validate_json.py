@@ -1,52 +1,372 @@
+import argparse
+import hashlib
 import json
+import logging
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import jsonschema
-from jsonschema import validate
+from jsonschema.exceptions import best_match
+import compressed
+from metrics import Metrics, Progress, profiled, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Screen index of sharded runs (excel_to_json_converter.INDEX_FILE)
+INDEX_FILE = '_index.json'
+
+# Screen files, plain or compressed by the converter's --compression
+JSON_SUFFIXES = tuple('.json' + suffix for suffix in compressed.SUFFIXES.values())
+
+# Results of earlier runs (kept in the validated folder), keyed by file content hash.
+# Bump CACHE_VERSION when validation itself changes so every cached result is dropped.
+CACHE_FILE = '_validation_cache.json'
+CACHE_VERSION = 2
+
+# Parallel validation sends files to the worker processes in chunks of at most this many
+MAX_CHUNK_SIZE = 500
+
+# Exit codes of main(), for CI
+EXIT_OK = 0
+EXIT_INVALID = 1  # Invalid files found (or validation stopped at --max-errors)
+EXIT_ERROR = 2    # Missing folder or unusable schema, nothing was validated
 
 def load_schema(schema_file):
     """Load the JSON schema from file."""
     with open(schema_file, 'r') as f:
         return json.load(f)
 
+def build_validator(schema):
+    """Check the schema once and build a reusable validator (format checkers included)."""
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema, format_checker=validator_class.FORMAT_CHECKER)
+
+def find_error(data, validator):
+    """The most relevant validation error of data, or None if it is valid."""
+    return best_match(validator.iter_errors(data))
+
+def validate_data(data, validator):
+    """Validate already parsed JSON data with a validator from build_validator."""
+    error = find_error(data, validator)
+    if error is None:
+        return True, None
+    return False, str(error)
+
+def describe_error(error):
+    """Report fields of a validation error: message, JSON path in the file and path in the schema."""
+    return {
+        'message': error.message,
+        'path': error.json_path,
+        'schema_path': '/'.join(str(part) for part in error.absolute_schema_path),
+    }
+
+def schema_hash(schema):
+    """Hash of a loaded schema (key order and formatting do not change it)."""
+    canonical = json.dumps({'version': CACHE_VERSION, 'schema': schema}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class ValidationCache:
+    """Validation results of earlier runs keyed by the sha256 of each file's (stored) bytes.
+
+    results ({digest: {'valid', 'error'}}) is what check_file looks files up in.
+    The cache is tied to one schema hash: a different schema drops every entry.
+    save() keeps only the results put by this run, so entries of deleted or
+    rewritten files do not pile up.
+    """
+
+    def __init__(self, cache_file, schema_digest):
+        self.cache_file = cache_file
+        self.schema_digest = schema_digest
+        self.results = {}
+        self.used = {}
+        if not os.path.exists(cache_file):
+            return
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable validation cache %s: %s", cache_file, e)
+            return
+        if cache.get('schema') == schema_digest:
+            self.results = cache.get('results', {})
+        else:
+            logger.info("Schema changed, validating every file again")
+
+    def put(self, digest, result):
+        self.used[digest] = result
+
+    def save(self, partial=False):
+        """Atomically replace the cache file with the results of this run.
+
+        partial=True (a run that stopped early) also keeps the earlier results it did not reach.
+        """
+        results = dict(self.results, **self.used) if partial else self.used
+        if results == self.results:
+            return
+        tmp_file = self.cache_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'schema': self.schema_digest, 'results': results}, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+
+def check_file(json_file, validator, metrics, cached=None):
+    """Read, parse and validate one file, recording stage times in metrics.
+
+    cached maps content hashes to earlier results (ValidationCache.results); a file
+    whose hash is in it is not parsed. Without it nothing is hashed and digest is None.
+    Unreadable files and invalid JSON count as invalid rather than raising.
+
+    Returns:
+        dict: {'file', 'valid', 'error' (describe_error fields or None), 'digest', 'bytes',
+               'cached', 'seconds'}
+    """
+    start = time.perf_counter()
+    raw = b''
+    digest = result = None
+    try:
+        with metrics.stage('read'):
+            with open(json_file, 'rb') as f:
+                raw = f.read()
+    except OSError as e:
+        result = {'valid': False, 'error': {'message': f"Cannot read file: {e}", 'path': None, 'schema_path': None}}
+    if result is None and cached is not None:
+        with metrics.stage('hash'):
+            digest = hashlib.sha256(raw).hexdigest()
+        result = cached.get(digest)
+    from_cache = result is not None and digest is not None
+    if result is None:
+        try:
+            with metrics.stage('parse'):
+                data = json.loads(compressed.decompress(raw, compressed.compression_of(json_file)))
+        except (OSError, EOFError, ValueError) as e:
+            result = {'valid': False, 'error': {'message': f"Not valid JSON: {e}", 'path': None, 'schema_path': None}}
+        else:
+            with metrics.stage('validate'):
+                error = find_error(data, validator)
+            result = {'valid': error is None, 'error': describe_error(error) if error is not None else None}
+    return dict(result, file=json_file, digest=digest, bytes=len(raw), cached=from_cache,
+                seconds=time.perf_counter() - start)
+
+# Validator and cached results of a worker process, set up once by _init_worker
+_worker = {}
+
+def _init_worker(schema, cached):
+    _worker['validator'] = build_validator(schema)
+    _worker['cached'] = cached
+
+def _check_chunk(json_files):
+    """Validate a chunk of files in a worker process; returns (results, metrics report)."""
+    metrics = Metrics()
+    results = [check_file(json_file, _worker['validator'], metrics, _worker['cached']) for json_file in json_files]
+    return results, metrics.report()
+
+def iter_results(json_files, schema, validator, metrics, cached=None, workers=1, chunk_size=None):
+    """Yield the check_file result of every file.
+
+    workers=1 validates in this process, in order. More workers validate chunks of
+    chunk_size files in a process pool (each process builds its validator once) and
+    results arrive chunk by chunk as they complete; worker stage times are merged
+    into metrics. Closing the generator early cancels the chunks not started yet.
+    """
+    if workers <= 1:
+        for json_file in json_files:
+            yield check_file(json_file, validator, metrics, cached)
+        return
+    if not chunk_size:
+        # About four chunks per worker balances uneven chunks without much overhead
+        chunk_size = min(MAX_CHUNK_SIZE, max(1, -(-len(json_files) // (workers * 4))))
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(schema, cached))
+    try:
+        futures = [executor.submit(_check_chunk, json_files[i:i + chunk_size])
+                   for i in range(0, len(json_files), chunk_size)]
+        for future in as_completed(futures):
+            results, report = future.result()
+            metrics.merge(report)
+            yield from results
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
 def validate_json_file(json_file, schema):
-    """Validate a single JSON file against the schema."""
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+    """Validate a single JSON file against the schema (a schema dict or a prebuilt validator)."""
+    if isinstance(schema, dict):
+        schema = build_validator(schema)
+    return validate_data(load_json_file(json_file), schema)
+
+def load_json_file(json_file):
+    """Parse one JSON file (.json.gz and .json.zst files are decompressed while reading)."""
+    with compressed.open_file(json_file) as f:
+        return json.load(f)
+
+def iter_json_files(json_dir):
+    """Yield every screen JSON file (plain or compressed) under json_dir, recursively and in sorted order.
+
+    Files starting with '_' (manifests, reports) or '.' (temporary files) are skipped.
+    Folders with an INDEX_FILE (sharded runs) are listed from the index, not walked.
+    """
+    for root, dirs, files in os.walk(json_dir):
+        if INDEX_FILE in files:
+            with open(os.path.join(root, INDEX_FILE), 'r', encoding='utf-8') as f:
+                screens = json.load(f)['screens']
+            dirs[:] = []
+            for path in sorted(entry['path'] for entry in screens.values()):
+                yield os.path.join(root, *path.split('/'))
+            continue
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.endswith(JSON_SUFFIXES) and not filename.startswith(('_', '.')):
+                yield os.path.join(root, filename)
+
+def latest_run(json_dir):
+    """Return the most recent timestamped run folder in json_dir, or None."""
+    runs = sorted(d for d in os.listdir(json_dir) if os.path.isdir(os.path.join(json_dir, d)))
+    return runs[-1] if runs else None
+
+def main(argv=None):
+    """Validate the selected folder; returns EXIT_OK, EXIT_INVALID or EXIT_ERROR."""
+    parser = argparse.ArgumentParser(description="Validate generated screen JSON against the schema")
+    parser.add_argument('--schema', default='screen_schema.json', help="JSON schema file")
+    parser.add_argument('--json-dir', default='json', help="Directory scanned recursively for screen JSON")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument('--run', help="Only validate this run folder inside --json-dir")
+    selection.add_argument('--latest', action='store_true', help="Only validate the most recent run folder")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes validating in parallel (0: one per CPU); 1 validates in this process")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help=f"Files per work unit sent to a worker process (default: about four chunks "
+                             f"per worker, at most {MAX_CHUNK_SIZE})")
+    parser.add_argument('--max-errors', type=int, default=None, metavar='N',
+                        help="Fail fast: stop after N invalid files")
+    parser.add_argument('--report', metavar='FILE',
+                        help="Write a JSON report with the counts and every invalid file with its error path")
+    parser.add_argument('--cache-file', metavar='FILE',
+                        help=f"Validation cache (default: {CACHE_FILE} in the validated folder); files "
+                             "whose content and schema are unchanged are reported from it without parsing")
+    parser.add_argument('--no-cache', action='store_true', help="Validate every file and leave the cache alone")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="Write stage timings, counts, per-file latency histogram and peak memory to FILE")
+    parser.add_argument('--profile', metavar='FILE', help="Run under cProfile and dump the stats to FILE")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument('-v', '--verbose', action='store_true', help="Also log every valid file")
+    verbosity.add_argument('-q', '--quiet', action='store_true', help="Only log invalid files and errors")
+    args = parser.parse_args(argv)
+    setup_logging(-1 if args.quiet else 1 if args.verbose else 0)
+
+    metrics = Metrics()
+    with profiled(args.profile):
+        report = _validate_dir(args, metrics)
+    if args.metrics:
+        metrics.save(args.metrics, json_dir=args.json_dir)
+        logger.info("Metrics written to %s", args.metrics)
+    if report is None:
+        return EXIT_ERROR
+    if args.report:
+        tmp_file = args.report + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, args.report)
+        logger.info("Report written to %s", args.report)
+    return EXIT_INVALID if report['invalid'] else EXIT_OK
+
+def _validate_dir(args, metrics):
+    """
+    Validate the selected run folders, recording timings and counts in metrics
+
+    Returns the report dict (counts plus every invalid file, sorted by path), or None
+    when the folder or the schema cannot be used.
+    """
+    schema_file = args.schema
+    json_dir = args.json_dir
+    if args.run:
+        json_dir = os.path.join(json_dir, args.run)
+    elif args.latest:
+        run = latest_run(json_dir) if os.path.isdir(json_dir) else None
+        if run is None:
+            logger.error("Error: No run folders found in '%s'", json_dir)
+            return None
+        json_dir = os.path.join(json_dir, run)
+    if not os.path.isdir(json_dir):
+        logger.error("Error: Directory '%s' does not exist", json_dir)
+        return None
+
+    # Load schema and build the validator once for every file
     try:
-        validate(instance=data, schema=schema)
-        return True, None
-    except jsonschema.exceptions.ValidationError as e:
-        return False, str(e)
-
-def main():
-    schema_file = 'screen_schema.json'
-    json_dir = 'json'
-    
-    # Load schema
-    schema = load_schema(schema_file)
-    
+        with metrics.stage('load_schema'):
+            schema = load_schema(schema_file)
+            validator = build_validator(schema)
+    except (OSError, ValueError, jsonschema.exceptions.SchemaError) as e:
+        logger.error("Error: Cannot use schema '%s': %s", schema_file, e)
+        return None
+    cache = None
+    if not args.no_cache:
+        cache = ValidationCache(args.cache_file or os.path.join(json_dir, CACHE_FILE), schema_hash(schema))
+
     # Validate each JSON file
     valid_files = 0
     invalid_files = 0
-    
-    for filename in os.listdir(json_dir):
-        if filename.endswith('.json'):
-            json_file = os.path.join(json_dir, filename)
-            is_valid, error = validate_json_file(json_file, schema)
-            
-            if is_valid:
-                print(f"✅ {filename} is valid.")
+    cached_files = 0
+    invalid = []
+    stopped = False
+
+    json_files = list(metrics.timed(iter_json_files(json_dir), 'scan'))
+    workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+    progress = Progress('Validating', total=len(json_files), unit='files')
+    results = iter_results(json_files, schema, validator, metrics, cache.results if cache is not None else None,
+                           workers=min(workers, len(json_files)), chunk_size=args.chunk_size)
+    try:
+        for result in results:
+            filename = os.path.relpath(result['file'], json_dir)
+            metrics.observe('file', result['seconds'])
+            metrics.count('files')
+            metrics.count('bytes', result['bytes'])
+            if cache is not None and result['digest'] is not None:
+                cache.put(result['digest'], {'valid': result['valid'], 'error': result['error']})
+            if result['cached']:
+                cached_files += 1
+                metrics.count('cached')
+
+            if result['valid']:
+                logger.debug("✅ %s is valid%s.", filename, " (cached)" if result['cached'] else "")
                 valid_files += 1
+                metrics.count('valid')
             else:
-                print(f"❌ {filename} is invalid:")
-                print(f"   Error: {error}")
+                error = result['error']
+                logger.warning("❌ %s is invalid:\n   Error: %s\n   At: %s", filename, error['message'], error['path'])
                 invalid_files += 1
-    
-    # Print summary
-    print("\nValidation Summary:")
-    print(f"Total files: {valid_files + invalid_files}")
-    print(f"Valid files: {valid_files}")
-    print(f"Invalid files: {invalid_files}")
+                metrics.count('invalid')
+                invalid.append(dict(error, file=filename))
+            progress.update()
+            if args.max_errors and invalid_files >= args.max_errors:
+                stopped = True
+                break
+    finally:
+        # Cancels the chunks not started yet when stopping early
+        results.close()
+    progress.finish()
+    if stopped:
+        logger.error("Stopped after %d invalid files (--max-errors), %d files not checked",
+                     invalid_files, len(json_files) - valid_files - invalid_files)
+    if cache is not None:
+        cache.save(partial=stopped)
+
+    # Log summary
+    logger.info("Validation Summary:")
+    logger.info("Total files: %d", valid_files + invalid_files)
+    logger.info("Valid files: %d", valid_files)
+    logger.info("Invalid files: %d", invalid_files)
+    if cache is not None:
+        logger.info("From cache: %d", cached_files)
+    return {
+        'json_dir': json_dir,
+        'schema': schema_file,
+        'files': len(json_files),
+        'checked': valid_files + invalid_files,
+        'valid': valid_files,
+        'invalid': invalid_files,
+        'cached': cached_files,
+        'stopped_early': stopped,
+        'invalid_files': sorted(invalid, key=lambda entry: entry['file']),
+    }
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())